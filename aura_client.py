@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Thin client for a running `main.py --serve` daemon. Standard library only, so it starts
+instantly from a shell or a hotkey.
+
+Usage:
+    python aura_client.py "take a screenshot"
+    python aura_client.py --audio command.wav
+    python aura_client.py --health
+"""
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from typing import Optional
+
+SERVE_URL = os.getenv("AURA_SERVE_URL", "http://127.0.0.1:8765")
+SERVE_TOKEN = os.getenv("AURA_SERVE_TOKEN", "")
+SERVE_TOKEN_FILE = os.getenv("AURA_SERVE_TOKEN_FILE", os.path.join(os.path.expanduser("~"), ".aura", "serve_token"))
+
+
+def load_token() -> str:
+    """AURA_SERVE_TOKEN, else the token the daemon wrote on first start."""
+    if SERVE_TOKEN:
+        return SERVE_TOKEN
+    try:
+        with open(SERVE_TOKEN_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def request(path: str, data: Optional[bytes] = None, content_type: str = "application/json",
+            url: str = SERVE_URL, timeout: float = 600) -> dict:
+    req = urllib.request.Request(url.rstrip("/") + path, data=data, method="POST" if data is not None else "GET")
+    req.add_header("Content-Type", content_type)
+    token = load_token()
+    if token:
+        req.add_header("X-Aura-Token", token)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read().decode("utf-8") or "{}") or {"error": str(e)}
+
+
+def _pick(plan: dict) -> Optional[int]:
+    """Same choices as the console dispatcher: YES for the top match, a number for another."""
+    print("Low confidence for this match. Candidates:")
+    for i, (name, score, _) in enumerate(plan["candidates"], 1):
+        print(f"  {i}. {name} (score={score:.3f})")
+    resp = input("Type YES to run the top match, a number to pick another, or anything else to abort: ").strip()
+    if resp.upper() == "YES":
+        return 0
+    if resp.isdigit() and 1 <= int(resp) <= len(plan["candidates"]):
+        return int(resp) - 1
+    return None
+
+
+def run(plan: dict, url: str, yes: bool) -> int:
+    if "transcript" in plan:
+        print(f"Transcription: {plan['transcript']}")
+    if plan.get("error"):
+        print(plan["error"])
+        return 1
+    choice = 0
+    if plan["args"] is not None:
+        print(f"Matched: {plan['script']} (via structured intent)")
+        print(f"Arguments: {plan['args']}")
+    else:
+        name, score, doc = plan["candidates"][0]
+        print(f"Matched: {name} (score={score:.3f})")
+        if doc:
+            print(f"Description: {doc}")
+        if not plan.get("confident") and not yes:
+            choice = _pick(plan)
+            if choice is None:
+                print("Aborted by user (low confidence).")
+                return 1
+    print(plan["dry_run"])
+    if not yes and input("Proceed with executing the script? Type YES to confirm: ").strip().upper() != "YES":
+        print("Execution aborted by user.")
+        return 1
+
+    result = request("/execute", json.dumps({"id": plan["id"], "choice": choice}).encode(), url=url)
+    if result.get("ok"):
+        print("Script executed successfully.\n")
+        print(result["output"])
+        return 0
+    print(f"Script failed: {result.get('output') or result.get('error')}")
+    return 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Send a command to a resident AURA daemon")
+    parser.add_argument("text", nargs="*", help="Command text")
+    parser.add_argument("--audio", metavar="WAV", help="Send a recorded WAV file instead of text")
+    parser.add_argument("--health", action="store_true", help="Print daemon status and exit")
+    parser.add_argument("--yes", action="store_true", help="Skip confirmation prompts")
+    parser.add_argument("--url", default=SERVE_URL, help=f"Daemon address (default: {SERVE_URL})")
+    args = parser.parse_args()
+
+    try:
+        if args.health:
+            print(json.dumps(request("/health", url=args.url), indent=2))
+            return 0
+        if args.audio:
+            with open(args.audio, "rb") as f:
+                plan = request("/audio", f.read(), content_type="audio/wav", url=args.url)
+        else:
+            text = " ".join(args.text) or input("Hukum krein aaka (in English please):\n")
+            plan = request("/command", json.dumps({"text": text}).encode(), url=args.url)
+        return run(plan, args.url, args.yes)
+    except urllib.error.URLError as e:
+        print(f"Cannot reach AURA daemon at {args.url}: {e.reason}. Start it with: python main.py --serve")
+        return 2
+    except KeyboardInterrupt:
+        print("\nExiting.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
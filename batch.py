@@ -0,0 +1,116 @@
+"""
+Batch/offline dispatch over a JSONL command file.
+
+Each input line is either a JSON string or an object with a "text" (or "command"/"input")
+field and an optional "id". Commands are matched in chunks with one embedding encode per
+chunk, approved scripts run on a bounded worker pool, and one JSONL result per command is
+written in input order with per-item timings.
+
+There is nobody to confirm anything, so approval is an explicit policy: a script runs only
+if it is on the allow-list (or auto_approve is set) and its match clears the confidence
+threshold. Everything else is reported with its dry-run and a skip reason.
+"""
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from dispatcher import CONFIDENCE_THRESHOLD
+from task_matcher import get_matcher, run_script
+
+logger = logging.getLogger("dispatcher")
+
+BATCH_CHUNK = 64
+BATCH_WORKERS = 4
+
+
+def read_commands(fh: TextIO) -> Iterator[Tuple[str, str]]:
+    """Yield (id, text) pairs from a JSONL stream, skipping blank or malformed lines."""
+    for lineno, line in enumerate(fh, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.warning("Batch line %d is not valid JSON: %s", lineno, e)
+            continue
+        if isinstance(item, str):
+            yield str(lineno), item
+            continue
+        if not isinstance(item, dict):
+            logger.warning("Batch line %d is neither a string nor an object", lineno)
+            continue
+        text = item.get("text") or item.get("command") or item.get("input")
+        if not text:
+            logger.warning("Batch line %d has no text/command/input field", lineno)
+            continue
+        yield str(item.get("id", lineno)), text
+
+
+def _execute(script: str, timeout: Optional[int]) -> Tuple[bool, str, float]:
+    t0 = time.perf_counter()
+    ok, out = run_script(script, args=[], dry_run=False, timeout=timeout)
+    return ok, out, (time.perf_counter() - t0) * 1000
+
+
+def run_batch(commands: Iterable[Tuple[str, str]], out: TextIO, allow: Optional[Set[str]] = None,
+              auto_approve: bool = False, threshold: float = CONFIDENCE_THRESHOLD,
+              chunk_size: int = BATCH_CHUNK, workers: int = BATCH_WORKERS,
+              timeout: Optional[int] = None) -> Dict[str, int]:
+    """Match, approve and run commands; write one JSON result line per command. Returns status counts."""
+    allow = allow or set()
+    matcher = get_matcher()
+    counts: Dict[str, int] = {}
+    commands = iter(commands)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="aura-batch") as pool:
+        while True:
+            chunk: List[Tuple[str, str]] = list(islice(commands, chunk_size))
+            if not chunk:
+                break
+            t0 = time.perf_counter()
+            ranked = matcher.search_batch([text for _, text in chunk], k=1)
+            match_ms = (time.perf_counter() - t0) * 1000 / len(chunk)
+
+            pending = []
+            for (item_id, text), hits in zip(chunk, ranked):
+                rec = {"id": item_id, "text": text, "script": None, "score": None,
+                       "match_ms": round(match_ms, 3)}
+                future = None
+                if not hits:
+                    rec["status"] = "no_match"
+                else:
+                    script, score, _ = hits[0]
+                    rec.update(script=script, score=round(score, 4))
+                    if score < threshold:
+                        rec["status"] = "skipped_low_confidence"
+                    elif not (auto_approve or script in allow):
+                        rec["status"] = "skipped_not_allowed"
+                    else:
+                        future = pool.submit(_execute, script, timeout)
+                    if future is None:
+                        rec["output"] = run_script(script, args=[], dry_run=True)[1]
+                pending.append((rec, future))
+
+            for rec, future in pending:
+                if future is not None:
+                    ok, output, exec_ms = future.result()
+                    rec.update(status="ok" if ok else "failed", output=output, exec_ms=round(exec_ms, 3))
+                rec["total_ms"] = round(rec["match_ms"] + rec.get("exec_ms", 0.0), 3)
+                counts[rec["status"]] = counts.get(rec["status"], 0) + 1
+                logger.info("Batch item %s -> %s (%s)", rec["id"], rec["script"], rec["status"])
+                out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            out.flush()
+    return counts
+
+
+def run_batch_file(in_path: str, out_path: str = "-", **kwargs) -> Dict[str, int]:
+    """run_batch over a JSONL file; out_path "-" writes results to stdout."""
+    with open(in_path, "r", encoding="utf-8") as fin:
+        if out_path == "-":
+            return run_batch(read_commands(fin), sys.stdout, **kwargs)
+        with open(out_path, "w", encoding="utf-8") as fout:
+            return run_batch(read_commands(fin), fout, **kwargs)
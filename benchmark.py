@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the command pipeline.
+
+Replays the utterance corpus in bench/corpus.jsonl (seeded from the transcriptions in
+logs/) and the WAV fixtures in bench/fixtures/ through each stage on CPU:
+
+    transcribe       voice_dispatch.transcribe_audio on every fixture
+    match            task_matcher.match_command, cold (empty query cache)
+    match_cached     the same utterances again, served by the query cache
+    parse_command    intent_parser with a local stub LLM in place of the remote chain
+    parse_cached     the same utterances again, served by the intent cache
+    dispatch_dry     dispatcher.dispatch_async up to the confirmation, which is declined
+
+and reports count, throughput and latency percentiles per stage as JSON. With --baseline,
+results are compared to a saved run and the exit code is 1 if any stage's p95 latency
+regressed by more than the tolerance. Stages whose dependencies are missing are skipped.
+
+Usage:
+    python benchmark.py [--out bench/results.json] [--baseline bench/baseline.json]
+    python benchmark.py --save-baseline
+    python benchmark.py --seed-corpus      # add new utterances from logs/ to the corpus
+    python benchmark.py --make-fixtures    # render spoken WAV fixtures with pyttsx3
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = "bench"
+CORPUS_FILE = os.path.join(BENCH_DIR, "corpus.jsonl")
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+TOLERANCE = float(os.getenv("AURA_BENCH_TOLERANCE", "0.2"))  # allowed p95 slowdown before failing
+LOG_FILES = ("logs/dispatch.log", "logs/voice_dispatch.log")
+
+_LOGGED_INPUT = re.compile(r"Matched user_input='(.*)' -> script=(\S+) score=([\d.]+)")
+_LOGGED_TRANSCRIPT = re.compile(r"Transcription result[^:]*: (.*)$")
+
+
+def _isolate(tmp: str) -> None:
+    """Keep the benchmark offline, on CPU, and away from the real logs and caches."""
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    os.environ.setdefault("AURA_DEVICE", "cpu")
+    os.environ["AURA_SPANS"] = "0"
+    os.environ["AURA_STREAM_OUTPUT"] = "0"
+    os.environ["AURA_QUERY_CACHE_FILE"] = ""
+    os.environ["AURA_DISPATCH_LOG"] = os.path.join(tmp, "dispatch.log")
+    os.environ["AURA_LOG_PATH"] = os.path.join(tmp, "voice_dispatch.log")
+    os.environ["AURA_INTENT_CACHE"] = os.path.join(tmp, "intent_cache.sqlite")
+
+
+def load_corpus(path: str = CORPUS_FILE) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def seed_corpus(path: str = CORPUS_FILE, log_files=LOG_FILES) -> int:
+    """
+    Append utterances seen in the logs that the corpus doesn't have yet. The logged match is
+    recorded as "expected" only as a starting point; review new entries by hand.
+    """
+    existing = load_corpus(path) if os.path.exists(path) else []
+    seen = {" ".join(e["text"].lower().split()) for e in existing}
+    added = []
+    for log in log_files:
+        if not os.path.exists(log):
+            continue
+        with open(log, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                m = _LOGGED_INPUT.search(line)
+                text, expected = (m.group(1), m.group(2)) if m else (None, None)
+                if m is None:
+                    m = _LOGGED_TRANSCRIPT.search(line)
+                    text = m.group(1).strip() if m else None
+                key = " ".join((text or "").lower().split())
+                if key and key not in seen:
+                    seen.add(key)
+                    added.append({"text": text, "expected": expected, "source": os.path.basename(log)})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for entry in added:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return len(added)
+
+
+def make_fixtures(corpus: List[dict], out_dir: str = FIXTURES_DIR, limit: int = 10) -> int:
+    """Render labelled corpus utterances to WAV with the offline pyttsx3 voice."""
+    import pyttsx3
+
+    os.makedirs(out_dir, exist_ok=True)
+    engine = pyttsx3.init()
+    labels = _read_fixture_labels(out_dir)
+    made = 0
+    for i, entry in enumerate(e for e in corpus if e.get("expected")):
+        if made >= limit:
+            break
+        name = f"tts_{i:02d}.wav"
+        engine.save_to_file(entry["text"], os.path.join(out_dir, name))
+        labels[name] = entry["text"]
+        made += 1
+    engine.runAndWait()
+    with open(os.path.join(out_dir, "labels.json"), "w", encoding="utf-8") as f:
+        json.dump(labels, f, indent=2, ensure_ascii=False)
+    return made
+
+
+def _read_fixture_labels(fixtures_dir: str) -> Dict[str, str]:
+    path = os.path.join(fixtures_dir, "labels.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def summarize(latencies_ms: List[float], wall_s: float, correct: Optional[int] = None) -> dict:
+    import numpy as np
+
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    row = {"count": int(values.size), "throughput_per_s": round(values.size / wall_s, 2) if wall_s else None,
+           "mean_ms": round(float(values.mean()), 3), "p50_ms": round(float(p50), 3),
+           "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3), "max_ms": round(float(values.max()), 3)}
+    if correct is not None:
+        row["accuracy"] = round(correct / values.size, 4)
+    return row
+
+
+def _timed(items: List, fn: Callable, check: Optional[Callable] = None) -> dict:
+    """Run fn over items, timing each call; check(item, result) -> bool counts correct answers."""
+    latencies, correct = [], 0
+    wall = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        result = fn(item)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if check is not None and check(item, result):
+            correct += 1
+    return summarize(latencies, time.perf_counter() - wall, correct if check is not None else None)
+
+
+class StubLLM:
+    """Stands in for the remote intent chain: picks the script sharing the most words with the input."""
+
+    def __init__(self, scripts: List[str], latency_ms: float = 0.0):
+        self.scripts = scripts
+        self.latency_ms = latency_ms
+
+    def invoke(self, inputs: dict) -> dict:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        words = set(re.findall(r"[a-z]+", inputs["input"].lower()))
+        best = max(self.scripts, key=lambda s: len(words & set(re.findall(r"[a-z]+", s.lower()))))
+        return {"script": best, "args": {}}
+
+
+def bench_transcribe(fixtures_dir: str = FIXTURES_DIR) -> dict:
+    import voice_dispatch as vd
+    from daemon import decode_audio
+
+    labels = _read_fixture_labels(fixtures_dir)
+    clips = []
+    for name in sorted(os.listdir(fixtures_dir)):
+        if name.endswith(".wav"):
+            with open(os.path.join(fixtures_dir, name), "rb") as f:
+                clips.append((name,) + decode_audio(f.read(), "audio/wav", vd.SAMPLE_RATE))
+    if not clips:
+        return {"skipped": f"no WAV fixtures in {fixtures_dir}"}
+
+    def _norm(text: str) -> str:
+        return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+    vd.get_model()  # load outside the timed region
+    row = _timed(clips, lambda c: vd.transcribe_audio(c[1], c[2]),
+                 check=lambda c, text: c[0] in labels and _norm(text) == _norm(labels[c[0]]))
+    row["audio_s"] = round(sum(audio.size / rate for _, audio, rate in clips), 2)
+    if not any(name in labels for name, _, _ in clips):
+        row.pop("accuracy", None)
+    return row
+
+
+def run_benchmark(corpus: List[dict], fixtures_dir: str = FIXTURES_DIR, llm_latency_ms: float = 0.0,
+                  stages: Optional[List[str]] = None) -> dict:
+    results: Dict[str, dict] = {}
+    texts = [e["text"] for e in corpus]
+    labelled = [e for e in corpus if e.get("expected")]
+
+    def _stage(name: str, fn: Callable[[], dict]) -> None:
+        if stages and name not in stages:
+            return
+        try:
+            results[name] = fn()
+        except ImportError as e:
+            results[name] = {"skipped": f"missing dependency: {e.name or e}"}
+        except Exception as e:
+            results[name] = {"skipped": f"{type(e).__name__}: {e}"}
+        print(f"  {name}: {results[name]}", file=sys.stderr)
+
+    _stage("transcribe", lambda: bench_transcribe(fixtures_dir))
+
+    import task_matcher as tm
+
+    def _match() -> dict:
+        tm.get_matcher().warm_up()
+        return _timed(labelled, lambda e: tm.match_command(e["text"]),
+                      check=lambda e, m: m[0] == e["expected"])
+
+    _stage("match", _match)
+    _stage("match_cached", lambda: _timed(labelled, lambda e: tm.match_command(e["text"]),
+                                          check=lambda e, m: m[0] == e["expected"]))
+
+    import intent_parser as ip
+
+    def _parse() -> dict:
+        ip._chain = StubLLM(list(tm.get_manifest()), llm_latency_ms)
+        return _timed(texts, ip.parse_command_with_source)
+
+    _stage("parse_command", _parse)
+    _stage("parse_cached", lambda: _timed(texts, ip.parse_command_with_source,
+                                          check=lambda _, r: r[1] == "intent_cache"))
+
+    def _dispatch_dry() -> dict:
+        import asyncio
+        import dispatcher as disp
+
+        async def _decline(prompt: str) -> bool:
+            return False
+
+        async def _top(candidates) -> Optional[int]:
+            return 0
+
+        def _one(text: str) -> Tuple[bool, str]:
+            with redirect_stdout(devnull):
+                return asyncio.run(disp.dispatch_async(text, confirm=_decline, pick=_top))
+
+        tm.get_matcher().get_model()  # without a matcher every dispatch would just fail fast
+        with open(os.devnull, "w") as devnull:
+            return _timed(texts, _one, check=lambda _, r: r[1] == "Execution aborted by user.")
+
+    _stage("dispatch_dry", _dispatch_dry)
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float = TOLERANCE) -> List[str]:
+    """Print current vs baseline per stage; return the stages whose p95 regressed past tolerance."""
+    regressed = []
+    print(f"{'stage':<14} {'p50 ms':>10} {'base':>10} {'p95 ms':>10} {'base':>10} {'thru/s':>9} {'base':>9}")
+    for stage, row in current["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if "skipped" in row or not base or "skipped" in base:
+            print(f"{stage:<14} {row.get('skipped') or 'no baseline'}")
+            continue
+        flag = ""
+        if row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressed.append(stage)
+            flag = "  REGRESSED"
+        print(f"{stage:<14} {row['p50_ms']:>10.2f} {base['p50_ms']:>10.2f} {row['p95_ms']:>10.2f} "
+              f"{base['p95_ms']:>10.2f} {row['throughput_per_s'] or 0:>9.1f} {base['throughput_per_s'] or 0:>9.1f}{flag}")
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="AURA offline pipeline benchmark")
+    parser.add_argument("--corpus", default=CORPUS_FILE, help="Utterance corpus (JSONL)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory of WAV fixtures")
+    parser.add_argument("--stage", action="append", help="Only run these stages")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated stub LLM latency")
+    parser.add_argument("--out", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write results to {BASELINE_FILE}")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Allowed p95 regression (0.2 = 20%%)")
+    parser.add_argument("--seed-corpus", action="store_true", help="Add new utterances from logs/ and exit")
+    parser.add_argument("--make-fixtures", action="store_true", help="Render WAV fixtures with pyttsx3 and exit")
+    args = parser.parse_args()
+
+    if args.seed_corpus:
+        print(f"Added {seed_corpus(args.corpus)} utterance(s) to {args.corpus}")
+        return 0
+    if args.make_fixtures:
+        print(f"Wrote {make_fixtures(load_corpus(args.corpus), args.fixtures)} fixture(s) to {args.fixtures}")
+        return 0
+
+    corpus = load_corpus(args.corpus)
+    with tempfile.TemporaryDirectory(prefix="aura-bench-") as tmp:
+        _isolate(tmp)
+        t0 = time.perf_counter()
+        stages = run_benchmark(corpus, args.fixtures, args.llm_latency_ms, args.stage)
+        result = {"meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                           "platform": platform.platform(), "machine": platform.machine(),
+                           "corpus": len(corpus), "total_s": round(time.perf_counter() - t0, 2)},
+                  "stages": stages}
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    elif not args.baseline:
+        print(text)
+    if args.save_baseline:
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressed = compare(result, json.load(f), args.tolerance)
+        if regressed:
+            print(f"[FAIL] p95 regressed by more than {args.tolerance:.0%}: {', '.join(regressed)}")
+            return 1
+        print("[OK] No stage regressed past tolerance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Resident AURA daemon: a localhost HTTP API over a warm process.
+
+`main.py --serve` keeps Whisper, the embedding matcher, the script manifest and (in pool
+mode) the worker pool loaded, so each command costs only inference plus execution.
+Confirmation stays with the caller: a command is first planned (routed, validated and
+dry-run), and only a plan id returned by the daemon can be executed. aura_client.py is
+the matching command-line client.
+
+Every request must carry the shared token as X-Aura-Token (AURA_SERVE_TOKEN, or a random
+token generated on first start into the user-only AURA_SERVE_TOKEN_FILE), address the
+daemon by 127.0.0.1/localhost (no DNS rebinding), and send JSON bodies as application/json
+so a browser cannot forge a "simple" cross-site POST.
+
+    GET  /health             liveness, tier stats and warm-up timings
+    POST /command            {"text": "..."}  -> plan
+    POST /audio[?rate=N]     WAV bytes (or raw float32 PCM with ?rate) -> transcript + plan
+    POST /execute            {"id": plan_id, "choice": 0} -> {"ok": ..., "output": ...}
+"""
+import io
+import json
+import logging
+import hmac
+import os
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import router
+import spans
+import task_matcher as tm
+from dispatcher import CONFIDENCE_THRESHOLD
+
+logger = logging.getLogger("dispatcher")
+
+SERVE_HOST = os.getenv("AURA_SERVE_HOST", "127.0.0.1")
+SERVE_PORT = int(os.getenv("AURA_SERVE_PORT", "8765"))
+SERVE_TOKEN = os.getenv("AURA_SERVE_TOKEN", "")  # overrides the token file
+SERVE_TOKEN_FILE = os.getenv("AURA_SERVE_TOKEN_FILE", os.path.join(os.path.expanduser("~"), ".aura", "serve_token"))
+MAX_BODY = int(os.getenv("AURA_SERVE_MAX_BODY", str(16 << 20)))  # ~8 minutes of 16 kHz float32 audio
+PLAN_TTL = 300  # seconds a plan stays executable
+PLAN_LIMIT = 256
+AUDIO_TYPES = {"audio/wav", "audio/x-wav", "audio/wave", "application/octet-stream"}
+
+
+def load_token(path: Optional[str] = None, create: bool = False) -> str:
+    """AURA_SERVE_TOKEN, else the token file; with create, a missing file gets a new random token (mode 0600)."""
+    if SERVE_TOKEN:
+        return SERVE_TOKEN
+    path = path or SERVE_TOKEN_FILE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            token = f.read().strip()
+        if token:
+            return token
+    except FileNotFoundError:
+        pass
+    if not create:
+        return ""
+    token = secrets.token_urlsafe(32)
+    os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token + "\n")
+    return token
+
+
+def decode_audio(body: bytes, content_type: str, rate: int) -> Tuple[np.ndarray, int]:
+    """Return (float32 mono samples, sample rate) from WAV bytes or raw little-endian float32 PCM."""
+    if body[:4] == b"RIFF" or "wav" in content_type:
+        import wave
+        try:
+            with wave.open(io.BytesIO(body), "rb") as wf:
+                width, channels, rate = wf.getsampwidth(), wf.getnchannels(), wf.getframerate()
+                frames = wf.readframes(wf.getnframes())
+        except (wave.Error, EOFError) as e:
+            raise ValueError(f"Invalid WAV audio: {e}") from e
+        if width == 2:
+            audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+        elif width == 4:
+            audio = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+        elif width == 1:
+            audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        else:
+            raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+        if channels > 1:
+            audio = audio.reshape(-1, channels).mean(axis=1)
+        return audio, rate
+    return np.frombuffer(body, dtype="<f4").astype(np.float32), rate
+
+
+class Daemon:
+    """Plans and executes commands against the resident matcher, manifest and models."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.warm = None
+        self._plans: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, voice: bool = True) -> None:
+        """Bring everything resident: index, embeddings, manifest, models and the worker pool."""
+        from warmup import start_warmup
+
+        try:
+            tm.index_scripts()
+            tm.generate_embeddings()
+        except Exception as e:  # e.g. the embedding model can't be downloaded; serve with what exists
+            logger.exception("Startup index/embedding step failed: %s", e)
+        tm.get_manifest()
+        self.warm = start_warmup(voice=voice)
+        if tm.EXEC_MODE == "pool":
+            from worker_pool import get_pool
+            get_pool()
+
+    def health(self) -> dict:
+        return {"ok": True, "pid": os.getpid(), "uptime_s": round(time.time() - self.started, 1),
+                "tiers": router.tier_stats(),
+                "warmup": {"timings": dict(self.warm.timings) if self.warm else {},
+                           "errors": {k: str(v) for k, v in self.warm.errors.items()} if self.warm else {}}}
+
+    def plan(self, text: str) -> dict:
+        """Route a command and dry-run it; nothing executes until the returned id is sent to execute()."""
+        with spans.request() as request_id:
+            return self._plan(text, request_id)
+
+    def _plan(self, text: str, request_id: str) -> dict:
+        r = router.route(text)
+        result = {"text": text, "tier": r.tier, "script": r.script, "args": r.args,
+                  "candidates": [[name, round(score, 4), doc] for name, score, doc in r.candidates]}
+        if r.tier in ("intent_cache", "llm"):
+            checked, reason = tm.validate_args(r.script, r.args)
+            if checked is None:
+                result.update(error=f"Cannot run: {reason}")
+                return result
+            result["args"] = checked
+            scripts = [r.script]
+        else:
+            scripts = [name for name, _, _ in r.candidates]
+            if not scripts:
+                result.update(error="No matching script")
+                return result
+            result["script"] = scripts[0]
+            result["confident"] = r.candidates[0][1] >= CONFIDENCE_THRESHOLD
+        with spans.span("dry_run", script=result["script"]):
+            result["dry_run"] = tm.run_script(result["script"], args=[], dry_run=True)[1]
+
+        plan_id = uuid.uuid4().hex
+        with self._lock:
+            self._plans[plan_id] = {"scripts": scripts, "args": result["args"], "created": time.monotonic(),
+                                    "request_id": request_id}
+            while len(self._plans) > PLAN_LIMIT:
+                self._plans.popitem(last=False)
+        result["id"] = plan_id
+        logger.info("Daemon planned %s: input=%r tier=%s script=%s", plan_id, text, r.tier, result["script"])
+        return result
+
+    def plan_audio(self, audio: np.ndarray, rate: int) -> dict:
+        import voice_dispatch as vd
+
+        with spans.request():
+            text = vd.transcribe_audio(audio, rate)
+            if not text:
+                return {"transcript": "", "error": "No speech recognized"}
+            result = self.plan(text)
+        result["transcript"] = text
+        return result
+
+    def execute(self, plan_id: str, choice: int = 0) -> dict:
+        """Run a previously planned command (optionally a runner-up candidate). Plans are single-use."""
+        with self._lock:
+            plan = self._plans.pop(plan_id, None)
+        if plan is None or time.monotonic() - plan["created"] > PLAN_TTL:
+            return {"ok": False, "output": "Unknown or expired plan id"}
+        if not 0 <= choice < len(plan["scripts"]):
+            return {"ok": False, "output": f"Invalid choice: {choice}"}
+        script = plan["scripts"][choice]
+        with spans.request(plan.get("request_id")), spans.span("execute", script=script) as s:
+            if plan["args"] is not None:
+                ok, out = tm.run_callable(script, plan["args"])
+            else:
+                ok, out = tm.run_script(script, args=[])
+            s["success"] = ok
+        if ok:
+            logger.info("Script executed: %s (daemon plan %s)", script, plan_id)
+        else:
+            logger.error("Script execution failed: %s -> %s (daemon plan %s)", script, out, plan_id)
+        return {"ok": ok, "script": script, "output": out}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    daemon: Daemon = None  # set by serve()
+    token: str = ""
+    allowed_hosts: frozenset = frozenset()
+
+    def log_message(self, fmt, *args):  # route http.server chatter to our log, not stderr
+        logger.debug("daemon %s - " + fmt, self.address_string(), *args)
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        if (self.headers.get("Host") or "").lower() not in self.allowed_hosts:
+            self._send(403, {"error": "Bad Host header"})
+            return False
+        if not hmac.compare_digest(self.headers.get("X-Aura-Token") or "", self.token):
+            self._send(403, {"error": f"Bad or missing X-Aura-Token (see {SERVE_TOKEN_FILE})"})
+            return False
+        return True
+
+    def _content_type(self) -> str:
+        return (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+    def _body(self) -> Optional[bytes]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self._send(413, {"error": f"Request body over {MAX_BODY} bytes"})
+            return None
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if urlparse(self.path).path == "/health":
+            self._send(200, self.daemon.health())
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        expected = AUDIO_TYPES if url.path == "/audio" else {"application/json"}
+        if self._content_type() not in expected:
+            self._send(415, {"error": f"Content-Type must be one of: {', '.join(sorted(expected))}"})
+            return
+        body = self._body()
+        if body is None:
+            return
+        try:
+            if url.path == "/audio":
+                rate = int(parse_qs(url.query).get("rate", ["16000"])[0])
+                audio, rate = decode_audio(body, self.headers.get("Content-Type", ""), rate)
+                self._send(200, self.daemon.plan_audio(audio, rate))
+                return
+            req: Dict = json.loads(body or b"{}")
+            if not isinstance(req, dict):
+                raise ValueError("Request body must be a JSON object")
+            if url.path == "/command":
+                text = str(req.get("text") or "").strip()
+                if not text:
+                    self._send(400, {"error": "Missing 'text'"})
+                    return
+                self._send(200, self.daemon.plan(text))
+            elif url.path == "/execute":
+                self._send(200, self.daemon.execute(str(req.get("id", "")), int(req.get("choice", 0))))
+            else:
+                self._send(404, {"error": "Not found"})
+        except (ValueError, TypeError) as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e:
+            logger.exception("Daemon request %s failed: %s", url.path, e)
+            self._send(500, {"error": f"Execution error: {e}"})
+
+
+def make_server(daemon: Daemon, host: str = SERVE_HOST, port: int = SERVE_PORT) -> ThreadingHTTPServer:
+    """Bind the HTTP server for a loaded daemon; only loopback names (and the bind address) are accepted as Host."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    port = server.server_address[1]
+    hosts = {f"127.0.0.1:{port}", f"localhost:{port}"}
+    if host not in ("", "0.0.0.0", "::"):
+        hosts.add(f"{host.lower()}:{port}")
+    server.RequestHandlerClass = type("AuraHandler", (_Handler,), {
+        "daemon": daemon, "token": load_token(create=True), "allowed_hosts": frozenset(hosts)})
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str = SERVE_HOST, port: int = SERVE_PORT, voice: bool = True) -> None:
+    """Load everything once and serve requests until interrupted."""
+    daemon = Daemon()
+    daemon.load(voice=voice)
+    server = make_server(daemon, host, port)
+    logger.info("AURA daemon listening on http://%s:%d (pid %d)", host, port, os.getpid())
+    print(f"AURA daemon listening on http://{host}:{port}")
+    if not SERVE_TOKEN:
+        print(f"Clients authenticate with the token in {SERVE_TOKEN_FILE}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        server.server_close()
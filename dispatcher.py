@@ -1,13 +1,19 @@
+import asyncio
 import os
 import logging
-from typing import Tuple
+import sys
+import threading
+from typing import Awaitable, Callable, List, Optional, Tuple
 
-from task_matcher import match_command, run_script, INDEX_FILE
+from spans import span
+from task_matcher import get_matcher, run_callable, run_script, run_script_async, validate_args, INDEX_FILE
 
 # Configuration
 CONFIDENCE_THRESHOLD = float(os.getenv("AURA_CONF_THRESH", "0.75"))
+TOP_K = int(os.getenv("AURA_TOP_K", "3"))  # candidates offered when a match is ambiguous
 DRY_RUN_DEFAULT = True
 LOG_PATH = os.getenv("AURA_DISPATCH_LOG", "logs/dispatch.log")
+STREAM_OUTPUT = os.getenv("AURA_STREAM_OUTPUT", "1") != "0"  # print script output as it is produced
 
 # Logging
 os.makedirs(os.path.dirname(LOG_PATH) or ".", exist_ok=True)
@@ -27,34 +33,113 @@ def _prompt_confirm(prompt: str) -> bool:
         return False
 
 
-def dispatch(user_input: str = "", script_name: str = "", args: dict = None) -> Tuple[bool, str]:
+def _prompt_pick(candidates: List[Tuple[str, float, str]]) -> Optional[int]:
+    """Let the user choose among ranked candidates. Returns the chosen index or None to abort."""
+    for i, (name, score, _) in enumerate(candidates, 1):
+        print(f"  {i}. {name} (score={score:.3f})")
+    try:
+        resp = input("Type YES to run the top match, a number to pick another, or anything else to abort: ").strip()
+    except KeyboardInterrupt:
+        return None
+    if resp.upper() == "YES":
+        return 0
+    if resp.isdigit() and 1 <= int(resp) <= len(candidates):
+        return int(resp) - 1
+    return None
+
+
+ConfirmCallback = Callable[[str], Awaitable[bool]]
+PickCallback = Callable[[List[Tuple[str, float, str]]], Awaitable[Optional[int]]]
+OutputCallback = Callable[[str, str], None]
+
+# console prompts from concurrent commands must not interleave
+_console_lock = threading.Lock()
+
+
+async def console_confirm(prompt: str) -> bool:
+    """Default async confirm: the blocking console prompt, run off the event loop."""
+    def _ask() -> bool:
+        with _console_lock:
+            return _prompt_confirm(prompt)
+    return await asyncio.to_thread(_ask)
+
+
+async def console_pick(candidates: List[Tuple[str, float, str]]) -> Optional[int]:
+    """Default async candidate picker backed by the console prompt."""
+    def _ask() -> Optional[int]:
+        with _console_lock:
+            return _prompt_pick(candidates)
+    return await asyncio.to_thread(_ask)
+
+
+async def _inline_confirm(prompt: str) -> bool:
+    # sync dispatch() only: prompt on the calling thread so Ctrl+C interrupts input() directly
+    with _console_lock:
+        return _prompt_confirm(prompt)
+
+
+async def _inline_pick(candidates: List[Tuple[str, float, str]]) -> Optional[int]:
+    with _console_lock:
+        return _prompt_pick(candidates)
+
+
+def console_output(stream: str, line: str) -> None:
+    """Default output callback: echo each script line as it arrives."""
+    print(line, file=sys.stderr if stream == "stderr" else sys.stdout, flush=True)
+
+
+async def dispatch_async(user_input: str = "", script_name: str = "", args: dict = None,
+                         candidates: Optional[List[Tuple[str, float, str]]] = None,
+                         confirm: Optional[ConfirmCallback] = None,
+                         pick: Optional[PickCallback] = None,
+                         on_output: Optional[OutputCallback] = None) -> Tuple[bool, str]:
+    """
+    Awaitable dispatch: matching, dry run, confirmation and execution all yield to the event
+    loop, so several commands can be in flight at once. confirm/pick default to console prompts.
+    Embedding-matched scripts stream their output through on_output (the console when
+    AURA_STREAM_OUTPUT is on) instead of printing it all at the end.
+    """
+    confirm = confirm or console_confirm
+    pick = pick or console_pick
+    if on_output is None and STREAM_OUTPUT:
+        on_output = console_output
+
     if script_name and args is not None:
         print(f"Matched: {script_name} (via structured intent)")
         print(f"Arguments: {args}")
-        ok, msg = run_script(script_name, args=[], dry_run=True)
+        checked, reason = validate_args(script_name, args)
+        if checked is None:
+            logger.warning("Rejected structured intent %s %r: %s", script_name, args, reason)
+            print(f"Cannot run: {reason}")
+            return False, reason
+        args = checked
+        with span("dry_run", script=script_name):
+            ok, msg = run_script(script_name, args=[], dry_run=True)
         logger.info("Dry-run for %s -> %s (ok=%s)", script_name, msg, ok)
         print(msg)
 
-        if not _prompt_confirm("Proceed with executing the script?"):
+        with span("confirm_wait"):
+            confirmed = await confirm("Proceed with executing the script?")
+        if not confirmed:
             logger.info("User aborted structured execution for %s", script_name)
             return False, "Execution aborted by user."
 
-        from task_matcher import run_callable
-        success, out = run_callable(script_name, args)
-        if success:
-            logger.info("Script executed: %s", script_name)
-            print("Script executed successfully.\n")
-            print(out)
-            return True, out
-        else:
-            logger.error("Script execution failed: %s -> %s", script_name, out)
-            print(f"Script failed: {out}")
-            return False, out
+        with span("execute", script=script_name, mode="callable") as s:
+            success, out = await asyncio.to_thread(run_callable, script_name, args)
+            s["success"] = success
+        return _report(script_name, success, out)
 
     # fallback: embedding-based dispatch
     try:
-        script_name, score, doc = match_command(user_input)
-        logger.info("Matched user_input=%r -> script=%s score=%.4f", user_input, script_name, score)
+        matcher = get_matcher()
+        if not candidates:
+            with span("match"):
+                candidates = await asyncio.to_thread(matcher.search, user_input, TOP_K)
+        if not candidates:
+            raise ValueError("Embedding store is empty; index some scripts first")
+        script_name, score, doc = candidates[0]
+        logger.info("Matched user_input=%r -> script=%s score=%.4f (query cache %s)",
+                    user_input, script_name, score, matcher.query_cache.stats())
     except Exception as e:
         logger.exception("Matcher error for input=%r: %s", user_input, e)
         return False, f"Matcher error: {e}"
@@ -64,28 +149,71 @@ def dispatch(user_input: str = "", script_name: str = "", args: dict = None) ->
         print(f"Description: {doc}")
 
     if score < CONFIDENCE_THRESHOLD:
-        print("Low confidence for this match.")
-        ok = _prompt_confirm("This action has low confidence. Confirm running the matched script?")
-        if not ok:
+        print("Low confidence for this match. Candidates:")
+        with span("confirm_wait", prompt="pick"):
+            choice = await pick(candidates)
+        if choice is None:
             logger.info("User aborted low-confidence match for %s", script_name)
             return False, "Aborted by user (low confidence)."
+        if choice:
+            script_name, score, doc = candidates[choice]
+            logger.info("User picked runner-up %s (score=%.4f)", script_name, score)
 
-    ok, msg = run_script(script_name, args=[], dry_run=True)
+    with span("dry_run", script=script_name):
+        ok, msg = run_script(script_name, args=[], dry_run=True)
     logger.info("Dry-run for %s -> %s (ok=%s)", script_name, msg, ok)
     print(msg)
 
-    ok = _prompt_confirm("Proceed with executing the script?")
+    with span("confirm_wait"):
+        ok = await confirm("Proceed with executing the script?")
     if not ok:
         logger.info("User aborted execution for %s", script_name)
         return False, "Execution aborted by user."
 
-    success, out = run_script(script_name, args=[], dry_run=False)
+    with span("execute", script=script_name, mode="script") as s:
+        success, out = await run_script_async(script_name, args=[], on_line=on_output)
+        s["success"] = success
+    return _report(script_name, success, out, streamed=on_output is not None)
+
+
+def _report(script_name: str, success: bool, out: str, streamed: bool = False) -> Tuple[bool, str]:
+    """Print the outcome; streamed output has already been shown, so only the status is printed."""
     if success:
         logger.info("Script executed: %s", script_name)
-        print("Script executed successfully.\n")
-        print(out)
+        print("Script executed successfully.\n" if not streamed else "\nScript executed successfully.")
+        if not streamed:
+            print(out)
         return True, out
-    else:
-        logger.error("Script execution failed: %s -> %s", script_name, out)
-        print(f"Script failed: {out}")
-        return False, out
\ No newline at end of file
+    logger.error("Script execution failed: %s -> %s", script_name, out)
+    print(f"Script failed: {out}")
+    return False, out
+
+
+def dispatch(user_input: str = "", script_name: str = "", args: dict = None,
+             candidates: Optional[List[Tuple[str, float, str]]] = None) -> Tuple[bool, str]:
+    """
+    Confirm and run a script. With script_name/args the structured intent is executed directly;
+    otherwise user_input is matched by embeddings (or the caller's precomputed candidates are used).
+    Synchronous wrapper around dispatch_async for the CLI; must not be called from a running event loop.
+    Prompts block the calling thread rather than a worker thread, and the loop installs no SIGINT
+    handler, so Ctrl+C at a prompt aborts the command instead of waiting on a thread stuck in input().
+    """
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(dispatch_async(user_input, script_name, args, candidates,
+                                           confirm=_inline_confirm, pick=_inline_pick))
+    try:
+        return loop.run_until_complete(task)
+    except KeyboardInterrupt:
+        if not task.done():
+            # let the running step clean up (e.g. kill a streaming child) before exiting
+            task.cancel()
+            try:
+                loop.run_until_complete(task)
+            except BaseException:
+                pass
+        raise
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
@@ -1,29 +1,27 @@
+import hashlib
+import json
 import os
-from typing import Optional, Tuple, Dict
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
 
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_huggingface import HuggingFaceEndpoint
-from langchain_core.runnables import RunnableMap, RunnablePassthrough
+import task_matcher
+from spans import span
 
 # Load local HuggingFace model via LangChain
 # Replace with your actual model name or endpoint
 MODEL_ID = os.getenv("AURA_LOCAL_MODEL", "mistralai/Mistral-7B-Instruct-v0.1")
 HF_API_KEY = os.getenv("HUGGINGFACEHUB_API_TOKEN")  # Required if using HuggingFace Hub
 
-llm = HuggingFaceEndpoint(
-    repo_id=MODEL_ID,
-    temperature=0.3,
-    max_new_tokens=512,
-    huggingfacehub_api_token=HF_API_KEY,
-)
+# Persistent parse cache: repeated commands skip the LLM round-trip
+INTENT_CACHE_PATH = os.getenv("AURA_INTENT_CACHE", "cache/intent_cache.sqlite")  # "" disables
+INTENT_CACHE_TTL = float(os.getenv("AURA_INTENT_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+INTENT_CACHE_MAX = int(os.getenv("AURA_INTENT_CACHE_MAX", "1000"))
+INDEX_FILE = "script_index.txt"
 
-# Output parser
-parser = JsonOutputParser()
-
-# Prompt template
-prompt = PromptTemplate.from_template(
-    """You are an intent parser for a local automation assistant. Your job is to extract:
+PROMPT_TEMPLATE = """You are an intent parser for a local automation assistant. Your job is to extract:
 1. The script name to run
 2. The arguments to pass to that script
 
@@ -39,25 +37,164 @@ Respond ONLY in JSON format using this structure:
 User command: {input}
 {format_instructions}
 """
-).partial(format_instructions=parser.get_format_instructions())
 
-# Chain
-chain = prompt | llm | parser
+_chain = None
+_chain_lock = threading.Lock()
 
-def parse_command(user_input: str) -> Optional[Tuple[str, Dict]]:
+
+def get_chain():
+    """Build the prompt | llm | parser chain on first use; LangChain is only imported here."""
+    global _chain
+    with _chain_lock:
+        if _chain is None:
+            from langchain_core.output_parsers import JsonOutputParser
+            from langchain_core.prompts import PromptTemplate
+            from langchain_huggingface import HuggingFaceEndpoint
+
+            llm = HuggingFaceEndpoint(
+                repo_id=MODEL_ID,
+                temperature=0.3,
+                max_new_tokens=512,
+                huggingfacehub_api_token=HF_API_KEY,
+            )
+            parser = JsonOutputParser()
+            prompt = PromptTemplate.from_template(PROMPT_TEMPLATE).partial(
+                format_instructions=parser.get_format_instructions())
+            _chain = prompt | llm | parser
+    return _chain
+
+
+class IntentCache:
     """
-    Parse user command into (script_name, args) using LangChain + HuggingFace.
-    Returns None if parsing fails.
+    SQLite cache of parsed intents keyed by normalized utterance.
+    Entries are tagged with a hash of the script index; when the index changes, entries
+    recorded against a different index are dropped. Expired (TTL) and least recently used
+    entries beyond the size limit are evicted on write.
     """
+
+    def __init__(self, path: str = INTENT_CACHE_PATH, ttl: float = INTENT_CACHE_TTL,
+                 max_entries: int = INTENT_CACHE_MAX, index_file: str = INDEX_FILE):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        self._index_hash: Optional[str] = None
+        self._index_stamp = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS intents ("
+                       "key TEXT PRIMARY KEY, index_hash TEXT NOT NULL, script TEXT NOT NULL, "
+                       "args TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            with db:  # commit on success, roll back on error
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split()).strip(" .,!?;:'\"")
+
+    def index_hash(self) -> str:
+        """Hash of the script whitelist, recomputed only when the index file changes."""
+        try:
+            st = os.stat(self.index_file)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return ""
+        if stamp != self._index_stamp:
+            with open(self.index_file, "rb") as fh:
+                self._index_hash = hashlib.sha256(fh.read()).hexdigest()
+            self._index_stamp = stamp
+        return self._index_hash
+
+    def get(self, user_input: str) -> Optional[Tuple[str, Dict]]:
+        now = time.time()
+        index_hash = self.index_hash()
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM intents WHERE index_hash != ?", (index_hash,))
+            row = db.execute("SELECT script, args, created FROM intents WHERE key = ?",
+                             (self.normalize(user_input),)).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.ttl:
+                db.execute("DELETE FROM intents WHERE key = ?", (self.normalize(user_input),))
+                return None
+            db.execute("UPDATE intents SET last_used = ? WHERE key = ?", (now, self.normalize(user_input)))
+        return row[0], json.loads(row[1])
+
+    def put(self, user_input: str, script: str, args: Dict) -> None:
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO intents VALUES (?, ?, ?, ?, ?, ?)",
+                       (self.normalize(user_input), self.index_hash(), script, json.dumps(args), now, now))
+            db.execute("DELETE FROM intents WHERE created < ?", (now - self.ttl,))
+            db.execute("DELETE FROM intents WHERE key NOT IN "
+                       "(SELECT key FROM intents ORDER BY last_used DESC LIMIT ?)", (self.max_entries,))
+
+
+_cache: Optional[IntentCache] = None
+
+
+def get_intent_cache() -> Optional[IntentCache]:
+    """Return the shared IntentCache, or None if caching is disabled or unavailable."""
+    global _cache
+    if _cache is None and INTENT_CACHE_PATH:
+        try:
+            _cache = IntentCache()
+        except Exception as e:
+            print(f"[intent_parser] Intent cache unavailable: {e}")
+    return _cache
+
+
+def parse_command_with_source(user_input: str) -> Tuple[Optional[Tuple[str, Dict]], str]:
+    """Like parse_command, but also report whether the answer came from "intent_cache" or the "llm"."""
+    with span("parse_command") as s:
+        result, source = _parse_command_with_source(user_input)
+        s.update(source=source, parsed=result is not None)
+    return result, source
+
+
+def _parse_command_with_source(user_input: str) -> Tuple[Optional[Tuple[str, Dict]], str]:
+    cache = get_intent_cache()
+    if cache is not None:
+        try:
+            hit = cache.get(user_input)
+            if hit is not None:
+                return hit, "intent_cache"
+        except sqlite3.Error as e:
+            print(f"[intent_parser] Intent cache read failed: {e}")
     try:
-        result = chain.invoke({"input": user_input})
+        result = get_chain().invoke({"input": user_input})
         script = result.get("script")
         args = result.get("args", {})
         if not script or not script.endswith(".py"):
-            return None
-        return script, args
+            return None, "llm"
+        checked, reason = task_matcher.validate_args(script, args)
+        if checked is None:  # a bad answer is not cached, so the next request asks the LLM again
+            print(f"[intent_parser] Not caching {script}: {reason}")
+        elif cache is not None:
+            try:
+                cache.put(user_input, script, args)
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                print(f"[intent_parser] Intent cache write failed: {e}")
+        return (script, args), "llm"
     except Exception as e:
         import traceback
         print(f"[intent_parser] Failed to parse command: {e}")
         traceback.print_exc()
-        return None
\ No newline at end of file
+        return None, "llm"
+
+
+def parse_command(user_input: str) -> Optional[Tuple[str, Dict]]:
+    """
+    Parse user command into (script_name, args) using LangChain + HuggingFace.
+    Results are served from the persistent intent cache when the same command was parsed before.
+    Returns None if parsing fails.
+    """
+    return parse_command_with_source(user_input)[0]
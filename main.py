@@ -3,8 +3,10 @@ import argparse
 import sys
 import logging
 import task_matcher as tm
-import dispatcher as disp
-import voice_dispatch as vd
+import batch
+import router
+import spans
+from warmup import start_warmup
 
 # Basic logging for startup tasks
 logging.basicConfig(level=logging.INFO, format="%(asctime)s\t%(levelname)s\t%(message)s")
@@ -14,11 +16,39 @@ def main():
     parser = argparse.ArgumentParser(description="AURA main entrypoint")
     parser.add_argument("--voice", action="store_true", help="Record once, transcribe and dispatch")
     parser.add_argument("--voice-loop", action="store_true", help="Enter continuous voice loop")
+    parser.add_argument("--voice-pipeline", action="store_true",
+                        help="Hands-free voice loop that records while earlier commands are processed")
     parser.add_argument("--reindex", action="store_true", help="Re-index scripts directory into script_index.txt")
-    parser.add_argument("--regen-embeddings", action="store_true", help="Regenerate script embeddings from docstrings")
+    parser.add_argument("--regen-embeddings", action="store_true", help="Re-encode all script embeddings, ignoring content hashes")
     parser.add_argument("--no-startup", action="store_true", help="Skip index/embedding steps on startup")
+    parser.add_argument("--no-warmup", action="store_true", help="Don't preload models in the background")
+    parser.add_argument("--batch", metavar="FILE", help="Dispatch every command in a JSONL file without prompts")
+    parser.add_argument("--batch-out", metavar="FILE", default="-", help="Write batch results as JSONL (default: stdout)")
+    parser.add_argument("--allow", default="", help="Comma-separated scripts that --batch may execute")
+    parser.add_argument("--auto-approve", action="store_true", help="Let --batch execute any confident match")
+    parser.add_argument("--workers", type=int, default=batch.BATCH_WORKERS,
+                        help=f"Concurrent script runs in --batch mode (default: {batch.BATCH_WORKERS})")
+    parser.add_argument("--serve", action="store_true", help="Run as a resident daemon for aura_client.py")
+    parser.add_argument("--host", default=None, help="--serve bind address (default: AURA_SERVE_HOST or 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=None, help="--serve port (default: AURA_SERVE_PORT or 8765)")
+    parser.add_argument("--no-voice", action="store_true", help="Don't load Whisper in --serve mode")
+    parser.add_argument("--latency-report", nargs="?", const="all", metavar="WINDOW", type=spans.window_arg,
+                        help="Print p50/p95/p99 per pipeline stage from the span log (e.g. 1h, 7d) and exit")
     args = parser.parse_args()
 
+    if args.latency_report:
+        sys.exit(spans.print_report(args.latency_report))
+
+    # The daemon does its own indexing and warm-up, then stays resident
+    if args.serve:
+        import daemon
+        daemon.serve(args.host or daemon.SERVE_HOST, args.port or daemon.SERVE_PORT, voice=not args.no_voice)
+        return
+
+    # Load models concurrently while indexing runs; first command blocks only on what it uses
+    if not args.no_warmup:
+        start_warmup(voice=args.voice or args.voice_loop or args.voice_pipeline)
+
     # Startup indexing / embedding (skip if user asks)
     if not args.no_startup:
         try:
@@ -31,43 +61,47 @@ def main():
                 tm.index_scripts()
 
             if args.regen_embeddings:
-                logger.info("Regenerating embeddings from script docstrings...")
-                tm.generate_embeddings()
+                logger.info("Regenerating all embeddings from script docstrings...")
+                tm.generate_embeddings(force=True)
             else:
-                # safe default: only generate if embeddings missing
-                try:
-                    import os
-                    if not os.path.exists("embeddings/script_embeddings.pkl"):
-                        logger.info("Embeddings missing; generating embeddings...")
-                        tm.generate_embeddings()
-                    else:
-                        logger.info("Embeddings found; skipping generation.")
-                except Exception as e:
-                    logger.warning("Embedding existence check failed: %s. Attempting to generate.", e)
-                    tm.generate_embeddings()
+                # incremental: only added/changed scripts are re-encoded
+                encoded = tm.generate_embeddings()
+                if encoded:
+                    logger.info("Embeddings updated for %d changed script(s).", encoded)
+                else:
+                    logger.info("Embeddings up to date; skipping generation.")
         except Exception as e:
             logger.exception("Startup index/embedding step failed: %s", e)
             # proceed — dispatcher and voice may still work if matcher has fallback
 
     # Runtime modes
+    if args.batch:
+        allow = {s.strip() for s in args.allow.split(",") if s.strip()}
+        counts = batch.run_batch_file(args.batch, args.batch_out, allow=allow,
+                                auto_approve=args.auto_approve, workers=args.workers)
+        logger.info("Batch finished: %s", counts)
+        return
+
+    # voice_dispatch pulls in audio/Whisper support, so import it only for voice modes
+    if args.voice_pipeline:
+        import voice_dispatch as vd
+        vd.pipelined_loop()
+        return
+
     if args.voice_loop:
+        import voice_dispatch as vd
         vd.live_loop()
         return
 
     if args.voice:
+        import voice_dispatch as vd
         vd.transcribe_and_dispatch_once()
         return
 
     # Default: interactive text prompt
     try:
         user_input = input("Hukum krein aaka (in English please):\n")
-        from intent_parser import parse_command
-        result = parse_command(user_input)
-        if result:
-            script_name, args = result
-            disp.dispatch(script_name=script_name, args=args)
-        else:
-            disp.dispatch(user_input)
+        router.route_and_dispatch(user_input)
     except KeyboardInterrupt:
         print("\nExiting.")
         return
@@ -0,0 +1,98 @@
+"""
+Confidence-tiered command router.
+
+The local embedding matcher runs first. A match is accepted outright when its score
+clears AURA_CONF_THRESH and the script's entry point takes no arguments; everything
+else (ambiguous or argument-bearing commands) escalates to the intent parser, whose
+persistent cache is consulted before the remote LLM. Each request records the tier
+that served it so the share of LLM calls avoided can be measured.
+"""
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import dispatcher as disp
+import spans
+from task_matcher import get_matcher, script_entry_params, validate_args
+
+logger = logging.getLogger("dispatcher")
+
+# Tiers, cheapest first. "embedding_fallback" means the LLM was asked but gave nothing usable
+# (no answer, or a script/args that fail the whitelist and signature check).
+TIERS = ("embedding", "intent_cache", "llm", "embedding_fallback")
+
+_tier_counts: Counter = Counter()
+_tier_lock = threading.Lock()
+
+
+class Route(NamedTuple):
+    tier: str
+    script: Optional[str]
+    args: Optional[Dict]
+    candidates: List[Tuple[str, float, str]]
+
+
+def _record(tier: str) -> None:
+    with _tier_lock:
+        _tier_counts[tier] += 1
+
+
+def tier_stats() -> Dict[str, float]:
+    """Per-tier request counts plus the fraction of requests that avoided a remote LLM call."""
+    with _tier_lock:
+        stats: Dict[str, float] = {t: _tier_counts[t] for t in TIERS}
+    total = sum(stats.values())
+    stats["total"] = total
+    stats["llm_avoided"] = (stats["embedding"] + stats["intent_cache"]) / total if total else 0.0
+    return stats
+
+
+def route(user_input: str, threshold: Optional[float] = None) -> Route:
+    """Decide how user_input should be dispatched without executing anything."""
+    threshold = disp.CONFIDENCE_THRESHOLD if threshold is None else threshold
+    candidates: List[Tuple[str, float, str]] = []
+    try:
+        with spans.span("match"):
+            candidates = get_matcher().search(user_input, k=disp.TOP_K)
+    except Exception as e:
+        logger.warning("Embedding tier unavailable for input=%r: %s", user_input, e)
+
+    if candidates:
+        script, score, _ = candidates[0]
+        try:
+            takes_args = bool(script_entry_params(script))
+        except KeyError:
+            takes_args = True
+        if score >= threshold and not takes_args:
+            _record("embedding")
+            logger.info("Routed input=%r tier=embedding script=%s score=%.4f", user_input, script, score)
+            return Route("embedding", script, None, candidates)
+
+    from intent_parser import parse_command_with_source
+    result, source = parse_command_with_source(user_input)
+    if result:
+        checked, reason = validate_args(result[0], result[1])
+        if checked is not None:
+            _record(source)
+            logger.info("Routed input=%r tier=%s script=%s", user_input, source, result[0])
+            return Route(source, result[0], checked, candidates)
+        logger.warning("Rejected %s intent for input=%r: %s", source, user_input, reason)
+
+    _record("embedding_fallback")
+    logger.info("Routed input=%r tier=embedding_fallback", user_input)
+    return Route("embedding_fallback", None, None, candidates)
+
+
+def dispatch_route(user_input: str, r: Route) -> Tuple[bool, str]:
+    """Execute a routing decision through the dispatcher's confirmation flow."""
+    if r.tier in ("intent_cache", "llm"):
+        return disp.dispatch(script_name=r.script, args=r.args)
+    return disp.dispatch(user_input, candidates=r.candidates)
+
+
+def route_and_dispatch(user_input: str) -> Tuple[bool, str]:
+    with spans.request():
+        result = dispatch_route(user_input, route(user_input))
+    logger.info("Tier stats: %s", tier_stats())
+    return result
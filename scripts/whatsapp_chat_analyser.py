@@ -5,14 +5,18 @@ This script parses an exported WhatsApp chat `.txt` file, filters messages by da
 identifies repeated messages, and highlights the most active sender (spammer) in that period.
 
 Features:
-- Parses chat lines into structured DataFrame
+- Parses chat lines into structured DataFrame (single pass, batched date parsing; multi-line messages kept whole)
 - Filters messages by date range
-- Detects repeated/spammed messages
-- Identifies top spammer by message count
+- Detects repeated/spammed messages, including near-duplicates (MinHash + LSH)
+- Identifies top spammer by amount of repeated content sent
+- Combined report across all exports in a directory (--dir); across groups, repeats are
+  matched on exact normalized wording rather than MinHash
 
 Usage:
 Run the script with optional CLI arguments:
     python chat_analyzer.py --chat "path/to/chat.txt" --start "YYYY-MM-DD" --end "YYYY-MM-DD"
+Analyse every export in a directory in parallel and print a combined report:
+    python chat_analyzer.py --dir "whatsapp_chats" --start "YYYY-MM-DD" --end "YYYY-MM-DD"
 
 Default values:
 - Chat file path: CHAT_FILE (hardcoded fallback)
@@ -23,10 +27,14 @@ Ensure the exported chat file uses the default WhatsApp format (date, time, send
 """
 
 import pandas as pd  # pyright: ignore[reportMissingModuleSource]
+import numpy as np
 import re
 import argparse
+import hashlib
+import json
 from datetime import datetime
 from collections import Counter
+from typing import Optional
 import os
 
 # Default fallback values
@@ -34,30 +42,198 @@ DEFAULT_CHAT_FILE = "whatsapp_chats/WhatsApp Chat with GNDU TECH CLUB.txt"
 DEFAULT_START_DATE = "2025-10-01"
 DEFAULT_END_DATE = "2025-11-04"
 
-def parse_chat(chat_file: str) -> pd.DataFrame:
-    """Parse WhatsApp exported chat file into a structured dataframe."""
-    with open(chat_file, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+# One header line per message: "<date>, <time> <am/pm> - <sender>: <text>". Lines without a
+# sender are system notices; lines that don't start with a header continue the previous message.
+CHAT_LINE = re.compile(r"(\d{1,2}/\d{1,2}/\d{2,4}), (\d{1,2}:\d{2})\s?([apAP][mM]?) - (?:(.*?): )?(.*)")
+DATE_FORMATS = ("%d/%m/%y %I:%M %p", "%d/%m/%Y %I:%M %p")
+CHUNK_MESSAGES = 100_000  # messages per parsed chunk; dates are converted one chunk at a time
+COLUMNS = ["datetime", "sender", "message"]
+
+# Parsed-chat cache: exports only grow at the end, so later runs parse just the appended bytes
+CHAT_CACHE_DIR = os.getenv("AURA_CHAT_CACHE", "cache/chats")  # "" disables
+CHAT_CACHE_VERSION = 2
+HASH_BLOCK = 1 << 20  # read size while hashing the cached prefix
+
 
-    data = []
-    chat_pattern = r"^(\d{1,2}/\d{1,2}/\d{2,4}), (\d{1,2}:\d{2})\s?([apAP][mM]?) - (.*?): (.*)"
+def _to_frame(stamps: list, senders: list, messages: list, offsets: list) -> pd.DataFrame:
+    """Build a chunk DataFrame, converting all timestamps at once and dropping unparseable ones."""
+    raw = pd.Series(stamps, dtype=object)
+    when = pd.to_datetime(raw, format=DATE_FORMATS[0], errors="coerce")
+    for fmt in DATE_FORMATS[1:]:
+        missing = when.isna()
+        if not missing.any():
+            break
+        when[missing] = pd.to_datetime(raw[missing], format=fmt, errors="coerce")
+    df = pd.DataFrame({"datetime": when, "sender": senders, "message": messages,
+                       "offset": np.asarray(offsets, dtype=np.int64)})
+    return df[when.notna().to_numpy()].reset_index(drop=True)
 
-    for line in lines:
-        match = re.match(chat_pattern, line)
-        if match:
+
+def iter_chat_chunks(chat_file: str, chunk_size: int = CHUNK_MESSAGES, start: int = 0):
+    """
+    Stream a chat export as DataFrames of at most chunk_size complete messages, beginning at
+    byte offset start (which must be the start of a line). Besides the COLUMNS, each row carries
+    "offset", the byte position of the message's first line. Only a consumer that processes
+    chunks as they arrive keeps memory bounded; parse_chat and the analysis collect them all.
+    """
+    stamps, senders, messages, offsets = [], [], [], []
+    in_message = False
+    pos = start
+    with open(chat_file, "rb") as f:
+        f.seek(start)
+        for raw in f:
+            line_start, pos = pos, pos + len(raw)
+            if line_start == 0 and raw.startswith(b"\xef\xbb\xbf"):
+                raw = raw[3:]
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            match = CHAT_LINE.match(line) if line[:1].isdigit() else None
+            if match is None:
+                if in_message:  # continuation of a multi-line message
+                    messages[-1] += "\n" + line
+                continue
             date_str, time_str, am_pm, sender, message = match.groups()
-            timestamp = f"{date_str} {time_str} {am_pm}".strip()
-            try:
-                date_obj = datetime.strptime(timestamp, "%d/%m/%y %I:%M %p")
-            except:
-                try:
-                    date_obj = datetime.strptime(timestamp, "%d/%m/%Y %I:%M %p")
-                except:
-                    continue
-            data.append([date_obj, sender, message])
+            in_message = sender is not None
+            if not in_message:
+                continue
+            if len(messages) >= chunk_size:  # the previous message is complete now
+                yield _to_frame(stamps, senders, messages, offsets)
+                stamps, senders, messages, offsets = [], [], [], []
+            stamps.append(f"{date_str} {time_str} {am_pm}")
+            senders.append(sender)
+            messages.append(message)
+            offsets.append(line_start)
+    if messages:
+        yield _to_frame(stamps, senders, messages, offsets)
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame({"datetime": pd.Series(dtype="datetime64[ns]"), "sender": pd.Series(dtype=object),
+                         "message": pd.Series(dtype=object), "offset": pd.Series(dtype=np.int64)})
+
+
+def _parse_from(chat_file: str, start: int = 0) -> pd.DataFrame:
+    frames = list(iter_chat_chunks(chat_file, start=start))
+    return pd.concat(frames, ignore_index=True) if frames else _empty_frame()
+
+
+def parse_chat(chat_file: str) -> pd.DataFrame:
+    """Parse WhatsApp exported chat file into a structured dataframe (the whole chat is held in memory)."""
+    return _parse_from(chat_file)[COLUMNS]
+
+
+def _cache_dir(chat_file: str, cache_root: str) -> str:
+    path = os.path.abspath(chat_file)
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "_", os.path.splitext(os.path.basename(path))[0])[:48]
+    return os.path.join(cache_root, f"{stem}-{hashlib.sha1(path.encode('utf-8')).hexdigest()[:10]}")
+
+
+def _prefix_hash(chat_file: str, length: int, h=None, start: int = 0):
+    """
+    Feed bytes [start, length) of the file into h (a fresh blake2b if None) and return it.
+    The whole prefix is hashed, so an edit anywhere in it is caught; passing back the hasher
+    that verified the old prefix extends it over appended bytes without re-reading them.
+    """
+    h = h or hashlib.blake2b(digest_size=16)
+    with open(chat_file, "rb") as f:
+        f.seek(start)
+        remaining = length - start
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK, remaining))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+    return h
+
+
+def _read_cache(cache_dir: str) -> tuple:
+    """Return (meta, frame) for a cache directory, or (None, None) if missing or inconsistent."""
+    try:
+        with open(os.path.join(cache_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != CHAT_CACHE_VERSION:
+            return None, None
+        when = np.load(os.path.join(cache_dir, "datetime.npy"))
+        offsets = np.load(os.path.join(cache_dir, "offset.npy"))
+        codes = np.load(os.path.join(cache_dir, "sender_codes.npy"))
+        with open(os.path.join(cache_dir, "messages.txt"), "r", encoding="utf-8", newline="") as f:
+            blob = f.read()
+    except (OSError, ValueError, KeyError):
+        return None, None
+    messages = blob.split("\x00") if meta["rows"] else []
+    if not (len(when) == len(offsets) == len(codes) == len(messages) == meta["rows"]):
+        return None, None
+    senders = np.asarray(meta["senders"], dtype=object)
+    df = pd.DataFrame({"datetime": when, "sender": senders[codes] if len(codes) else codes.astype(object),
+                       "message": messages, "offset": offsets})
+    return meta, df
+
 
-    df = pd.DataFrame(data, columns=["datetime", "sender", "message"])
-    return df
+def _write_cache(cache_dir: str, chat_file: str, df: pd.DataFrame, st: os.stat_result,
+                 hasher=None, hashed: int = 0) -> None:
+    """
+    Write the columns, then swap in meta.json last so readers never see a half-written cache.
+    hasher, if given, already covers the first hashed bytes of the file.
+    """
+    # the final message may still gain continuation lines, so the next run re-parses from its start
+    resume = int(df["offset"].iloc[-1]) if len(df) else 0
+    if hasher is None or resume < hashed:
+        hasher, hashed = None, 0
+    prefix_hash = _prefix_hash(chat_file, resume, hasher, hashed).hexdigest()
+    codes, senders = pd.factorize(df["sender"])
+    os.makedirs(cache_dir, exist_ok=True)
+    columns = {"datetime.npy": df["datetime"].to_numpy(),
+               "offset.npy": df["offset"].to_numpy(np.int64),
+               "sender_codes.npy": codes.astype(np.int32)}
+    for name, arr in columns.items():
+        tmp = os.path.join(cache_dir, name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp, os.path.join(cache_dir, name))
+    tmp = os.path.join(cache_dir, "messages.txt.tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        f.write("\x00".join(m.replace("\x00", "") for m in df["message"]))
+    os.replace(tmp, os.path.join(cache_dir, "messages.txt"))
+    meta = {"version": CHAT_CACHE_VERSION, "source": os.path.abspath(chat_file), "rows": len(df),
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns, "resume_offset": resume,
+            "prefix_hash": prefix_hash, "senders": [str(s) for s in senders]}
+    tmp = os.path.join(cache_dir, "meta.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(cache_dir, "meta.json"))
+
+
+def load_chat(chat_file: str, cache_root: str = CHAT_CACHE_DIR) -> pd.DataFrame:
+    """
+    parse_chat with a persistent per-file cache. An unchanged file is served straight from the
+    cache; a grown file is parsed only from the start of its last cached message; a file whose
+    cached prefix changed (re-exported, edited, truncated) is parsed from scratch.
+    """
+    if not cache_root:
+        return parse_chat(chat_file)
+    cache_dir = _cache_dir(chat_file, cache_root)
+    st = os.stat(chat_file)
+    meta, cached = _read_cache(cache_dir)
+    if meta is not None and meta["size"] == st.st_size and meta["mtime_ns"] == st.st_mtime_ns:
+        return cached[COLUMNS]
+
+    hasher = None
+    if meta is not None and st.st_size >= meta["resume_offset"]:
+        hasher = _prefix_hash(chat_file, meta["resume_offset"])
+        if hasher.hexdigest() != meta["prefix_hash"]:
+            hasher = None
+    if hasher is not None:
+        resume = meta["resume_offset"]
+        kept = cached[cached["offset"].to_numpy() < resume]
+        fresh = _parse_from(chat_file, start=resume)
+        df = pd.concat([kept, fresh], ignore_index=True) if len(kept) else fresh
+    else:
+        df = _parse_from(chat_file)
+    try:
+        _write_cache(cache_dir, chat_file, df, st, hasher, meta["resume_offset"] if hasher is not None else 0)
+    except OSError as e:
+        print(f"[WARN] Could not update chat cache {cache_dir}: {e}")
+    return df[COLUMNS]
 
 def filter_by_date(df: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
     """Filter messages between date range."""
@@ -65,16 +241,300 @@ def filter_by_date(df: pd.DataFrame, start_date: str, end_date: str) -> pd.DataF
     end = datetime.strptime(end_date, "%Y-%m-%d")
     return df[(df["datetime"] >= start) & (df["datetime"] <= end)]
 
-def find_repeated_messages(df: pd.DataFrame, threshold: int = 2) -> pd.Series:
-    """Find repeated/spammed messages."""
-    msg_counts = df["message"].value_counts()
-    repeated = msg_counts[msg_counts > threshold]
-    return repeated
+# Near-duplicate (spam) detection: character shingles -> MinHash signatures -> LSH banding.
+# Only distinct normalized messages are signed, and each LSH bucket is linked to its first
+# member, so the work grows linearly with the number of messages instead of quadratically.
+SHINGLE_SIZE = 5  # characters per shingle
+NUM_PERM = 64  # MinHash signature length
+LSH_BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 Jaccard usually share a bucket
+SIMILARITY = 0.7  # estimated Jaccard needed to put two messages in one cluster
+MINHASH_BATCH = 50_000  # distinct messages signed at a time; bounds memory
+PLACEHOLDERS = {"<media omitted>", "this message was deleted", "you deleted this message", "null"}
+
+_perm_rng = np.random.default_rng(20251104)
+_PERM_A = _perm_rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _perm_rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+
+
+def normalize_message(text: str) -> str:
+    """Case-, whitespace- and edit-marker-insensitive form used for duplicate detection."""
+    text = str(text).lower().replace("<this message was edited>", "")
+    return " ".join(text.split()).strip(".,!?;:'\"")
+
+
+def _shingle_hashes(texts: list) -> tuple:
+    """
+    64-bit hashes of every SHINGLE_SIZE-character window of each text, computed for all texts
+    at once over their concatenated code points. Returns (hashes, start index of each text's
+    hashes); texts shorter than a shingle hash to a single value.
+    """
+    k = SHINGLE_SIZE
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    points = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    points = np.concatenate([points, np.zeros(k, dtype=np.uint64)])
+    windows = np.maximum(lengths - k + 1, 1)
+    first = np.cumsum(windows) - windows
+    owner = np.repeat(np.arange(len(texts)), windows)
+    pos = (np.cumsum(lengths) - lengths)[owner] + np.arange(windows.sum()) - first[owner]
+    width = np.minimum(lengths[owner], k)
+    h = np.zeros(pos.size, dtype=np.uint64)
+    for j in range(k):
+        h = h * np.uint64(1_000_003) + np.where(j < width, points[pos + j], np.uint64(0))
+    h ^= h >> np.uint64(33)  # murmur3 finalizer spreads the polynomial hash
+    h *= np.uint64(0xFF51AFD7ED558CCD)
+    h ^= h >> np.uint64(33)
+    return h, first
+
+
+def minhash_signatures(texts: list) -> np.ndarray:
+    """(len(texts), NUM_PERM) uint32 MinHash signatures of the texts' character shingles."""
+    sig = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    for lo in range(0, len(texts), MINHASH_BATCH):
+        h, first = _shingle_hashes(texts[lo:lo + MINHASH_BATCH])
+        for i in range(NUM_PERM):
+            sig[lo:lo + len(first), i] = np.minimum.reduceat((_PERM_A[i] * h + _PERM_B[i]) >> np.uint64(32), first)
+    return sig
+
+
+def _lsh_components(sig: np.ndarray) -> np.ndarray:
+    """Connected components of signatures that share an LSH bucket and agree on >= SIMILARITY of rows."""
+    n = len(sig)
+    rows = NUM_PERM // LSH_BANDS
+    left, right = [], []
+    for band in range(LSH_BANDS):
+        block = np.ascontiguousarray(sig[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        leader = first[inverse.ravel()]
+        members = np.flatnonzero(leader != np.arange(n))
+        if members.size:
+            similar = (sig[members] == sig[leader[members]]).mean(axis=1) >= SIMILARITY
+            left.append(members[similar])
+            right.append(leader[members[similar]])
+    labels = np.arange(n)
+    if not left:
+        return labels
+    left, right = np.concatenate(left), np.concatenate(right)
+    while True:  # min-label propagation with pointer jumping until every component agrees
+        before = labels.copy()
+        np.minimum.at(labels, left, labels[right])
+        np.minimum.at(labels, right, labels[left])
+        labels = labels[labels]
+        if np.array_equal(labels, before):
+            return labels
+
+
+def near_duplicate_clusters(messages: pd.Series) -> np.ndarray:
+    """Cluster id per message (near-duplicates share an id); -1 for placeholders and empty messages."""
+    normalized = messages.map(normalize_message)
+    codes, distinct = pd.factorize(normalized)
+    labels = np.full(len(distinct), -1, dtype=np.int64)
+    keep = np.array([bool(t) and t not in PLACEHOLDERS for t in distinct], dtype=bool)
+    if keep.any():
+        texts = list(distinct[keep])
+        labels[keep] = np.flatnonzero(keep)[_lsh_components(minhash_signatures(texts))]
+    return np.where(codes >= 0, labels[codes], -1)
+
+
+def _repeated_mask(clusters: np.ndarray, threshold: int) -> np.ndarray:
+    """True for messages whose near-duplicate cluster was sent more than threshold times."""
+    valid = clusters >= 0
+    sizes = np.bincount(clusters[valid]) if valid.any() else np.zeros(0, dtype=np.int64)
+    mask = np.zeros(len(clusters), dtype=bool)
+    mask[valid] = sizes[clusters[valid]] > threshold
+    return mask
+
+
+def find_repeated_messages(df: pd.DataFrame, threshold: int = 2, clusters: np.ndarray = None) -> pd.Series:
+    """Find repeated/spammed messages, counting near-duplicates together under their most common wording."""
+    clusters = near_duplicate_clusters(df["message"]) if clusters is None else clusters
+    mask = _repeated_mask(clusters, threshold)
+    if not mask.any():
+        return pd.Series(dtype=np.int64, name="count")
+    pairs = pd.DataFrame({"cluster": clusters[mask], "message": df["message"].to_numpy()[mask]})
+    wording = pairs.value_counts().reset_index().drop_duplicates("cluster").set_index("cluster")["message"]
+    sizes = pairs["cluster"].value_counts()
+    return pd.Series(sizes.to_numpy(), index=wording.loc[sizes.index].to_numpy(), name="count")
+
+
+def spam_by_sender(df: pd.DataFrame, threshold: int = 2, clusters: np.ndarray = None) -> pd.Series:
+    """Number of repeated (near-duplicate) messages each sender sent, most first."""
+    clusters = near_duplicate_clusters(df["message"]) if clusters is None else clusters
+    return df["sender"][_repeated_mask(clusters, threshold)].value_counts()
+
+
+def top_spammer(df: pd.DataFrame, threshold: int = 2, clusters: np.ndarray = None) -> tuple[Optional[str], int]:
+    """Find who sent the most repeated messages. Returns (None, 0) if nothing was repeated."""
+    spam = spam_by_sender(df, threshold, clusters)
+    if spam.empty:
+        return None, 0
+    return spam.index[0], int(spam.iloc[0])
+
+
+PREVIEW_CHARS = 60  # message text kept per repeated message in directory-mode aggregates
+
+
+def _chat_name(chat_file: str) -> str:
+    name = os.path.splitext(os.path.basename(chat_file))[0]
+    return name[len("WhatsApp Chat with "):] if name.startswith("WhatsApp Chat with ") else name
+
+
+def chat_summary(chat_file: str, start_date: str, end_date: str, threshold: int = 2,
+                 use_cache: bool = True, top: int = 5) -> dict:
+    """
+    Analyse one export and return compact aggregates instead of the DataFrame: sender and
+    per-sender spam counts, every distinct normalized message as a 64-bit hash with its count, and short
+    previews only for messages already repeated in this chat (see chat_previews for the rest).
+    """
+    df = load_chat(chat_file) if use_cache else parse_chat(chat_file)
+    df = filter_by_date(df, start_date, end_date)
+    counts, wording = _wording_counts(df["message"])
+    hashes = _message_hashes(counts.index)
+    local = counts.to_numpy() > threshold
+    clusters = near_duplicate_clusters(df["message"])
+    repeated = find_repeated_messages(df, threshold, clusters)
+    spam = spam_by_sender(df, threshold, clusters)
+    return {"chat": _chat_name(chat_file), "path": chat_file, "messages": len(df),
+            "senders": df["sender"].value_counts().to_dict(),
+            "spam": {str(k): int(v) for k, v in spam.items()},
+            "repeated": [(str(m)[:PREVIEW_CHARS], int(c)) for m, c in repeated.head(top).items()],
+            "top_spammer": (str(spam.index[0]), int(spam.iloc[0])) if len(spam) else None,
+            "hashes": hashes, "counts": counts.to_numpy(np.int64),
+            "previews": {int(h): str(m)[:PREVIEW_CHARS]
+                         for h, m in zip(hashes[local], wording.loc[counts.index[local]])}}
+
+
+def _wording_counts(messages: pd.Series) -> tuple:
+    """(count per normalized wording, most common raw wording per key), without placeholders or empty messages."""
+    keys = messages.map(normalize_message)
+    valid = (keys != "") & ~keys.isin(PLACEHOLDERS)
+    pairs = pd.DataFrame({"key": keys[valid], "message": messages[valid]})
+    wording = pairs.value_counts().reset_index().drop_duplicates("key").set_index("key")["message"]
+    return pairs["key"].value_counts(), wording
+
+
+def _message_hashes(keys: pd.Index) -> np.ndarray:
+    return pd.util.hash_pandas_object(keys.to_series(), index=False).to_numpy(np.uint64)
+
+
+def chat_previews(chat_file: str, hashes: list, start_date: str, end_date: str, use_cache: bool = True) -> dict:
+    """Second pass for merge_summaries: previews of the given message hashes from one export."""
+    df = load_chat(chat_file) if use_cache else parse_chat(chat_file)
+    _, wording = _wording_counts(filter_by_date(df, start_date, end_date)["message"])
+    keys = _message_hashes(wording.index)
+    wanted = np.isin(keys, np.asarray(hashes, dtype=np.uint64))
+    return {int(h): str(m)[:PREVIEW_CHARS] for h, m in zip(keys[wanted], wording[wanted])}
+
+
+def merge_summaries(summaries: list, threshold: int = 2, top: int = 10, lookup=None) -> dict:
+    """
+    Combine per-chat aggregates: top senders, spammers and messages repeated in two or more groups.
+    Within a group, repeats are near-duplicate clusters, and a sender's spam count is the sum of
+    those per-group counts. Across groups, messages are matched on exact normalized wording
+    only: near-duplicates posted to different groups are not combined. Messages repeated only
+    across groups have no preview in any summary; lookup({path: [hash, ...]}) is called once
+    with those and returns {hash: preview} (chat_previews per path).
+    """
+    senders, spam = Counter(), Counter()
+    for s in summaries:
+        senders.update(s["senders"])
+        spam.update(s["spam"])
+    report = {"chats": len(summaries), "messages": sum(s["messages"] for s in summaries),
+              "top_senders": senders.most_common(top), "top_spammers": spam.most_common(top), "repeated": [],
+              "groups": sorted(({k: s[k] for k in ("chat", "messages", "repeated", "top_spammer")}
+                                for s in summaries), key=lambda g: -g["messages"])}
+    with_messages = [s for s in summaries if len(s["hashes"])]
+    if not with_messages:
+        return report
+    hashes = np.concatenate([s["hashes"] for s in with_messages])
+    counts = np.concatenate([s["counts"] for s in with_messages])
+    owner = np.repeat(np.arange(len(with_messages)), [len(s["hashes"]) for s in with_messages])
+    unique, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    totals = np.bincount(inverse, weights=counts).astype(np.int64)
+    groups = np.bincount(inverse)  # each chat lists a message once, so this counts chats
+    hits = np.flatnonzero((totals > threshold) & (groups > 1))  # single-group repeats are in the breakdown
+    hits = hits[np.lexsort((-groups[hits], -totals[hits]))][:top]
+
+    previews = {}
+    for s in with_messages:
+        previews.update(s["previews"])
+    missing = {}
+    for i in hits:
+        if int(unique[i]) not in previews:
+            missing.setdefault(with_messages[owner[first[i]]]["path"], []).append(int(unique[i]))
+    if missing and lookup is not None:
+        previews.update(lookup(missing))
+    for i in hits:
+        report["repeated"].append((previews.get(int(unique[i]), "<message unavailable>"),
+                                   int(totals[i]), int(groups[i])))
+    return report
+
+
+def analyse_directory(chat_dir: str, start_date: str, end_date: str, threshold: int = 2,
+                      workers: int = 0, use_cache: bool = True) -> dict:
+    """Summarise every .txt export in chat_dir on a process pool, then merge the aggregates."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    files = sorted(os.path.join(chat_dir, f) for f in os.listdir(chat_dir) if f.lower().endswith(".txt"))
+    workers = min(len(files), workers or os.cpu_count() or 1)
+    pool = None
+
+    def _map(fn, calls: list) -> list:
+        nonlocal pool
+        if pool is not None:
+            try:
+                return [f.result() for f in [pool.submit(fn, *c) for c in calls]]
+            except Exception as e:  # e.g. no process support when run inside an embedding host
+                print(f"[WARN] Parallel analysis unavailable ({e}); analysing sequentially")
+                pool.shutdown(cancel_futures=True)
+                pool = None
+        return [fn(*c) for c in calls]
+
+    def _lookup(missing: dict) -> dict:
+        previews = {}
+        for found in _map(chat_previews, [(p, h, start_date, end_date, use_cache) for p, h in missing.items()]):
+            previews.update(found)
+        return previews
+
+    try:
+        if workers > 1:
+            try:
+                pool = ProcessPoolExecutor(max_workers=workers)
+            except Exception as e:
+                print(f"[WARN] Parallel analysis unavailable ({e}); analysing sequentially")
+        summaries = _map(chat_summary, [(f, start_date, end_date, threshold, use_cache) for f in files])
+        return merge_summaries(summaries, threshold, lookup=_lookup)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _safe(text: str) -> str:
+    return text[:40].replace("\n", " ").encode("ascii", "ignore").decode("ascii")
+
+
+def print_directory_report(report: dict) -> None:
+    print(f"\n[INFO] {report['chats']} chats, {report['messages']} messages in range")
+    print("\n[GROUPS] Per-group breakdown:")
+    for g in report["groups"]:
+        spammer = f"{g['top_spammer'][0]} ({g['top_spammer'][1]})" if g["top_spammer"] else "-"
+        print(f"   - {_safe(g['chat'])}: {g['messages']} messages, top spammer {spammer}")
+        for msg, count in g["repeated"]:
+            print(f"       {_safe(msg)}... ({count} times)")
+    print("\n[SENDERS] Top senders across groups:")
+    for sender, count in report["top_senders"]:
+        print(f"   - {sender}: {count} messages")
+    if report["top_spammers"]:
+        print("\n[ALERT] Top spammers across groups:")
+        for sender, count in report["top_spammers"]:
+            print(f"   - {sender}: {count} repeated messages")
+    if report["repeated"]:
+        print("\n[REPEAT] Repeated messages across groups (same normalized wording):")
+        for msg, count, groups in report["repeated"]:
+            print(f"   - {_safe(msg)}... ({count} times in {groups} group{'s' if groups != 1 else ''})")
+    else:
+        print("\n[OK] No messages repeated across groups!")
 
-def top_spammer(df: pd.DataFrame) -> tuple[str, int]:
-    """Find who sent the most repeated messages."""
-    sender_counts = df["sender"].value_counts()
-    return sender_counts.idxmax(), sender_counts.max()
 
 def main():
     parser = argparse.ArgumentParser(description="WhatsApp Chat Analyzer")
@@ -82,29 +542,45 @@ def main():
     parser.add_argument("--start", type=str, default=DEFAULT_START_DATE, help="Start date (YYYY-MM-DD)")
     parser.add_argument("--end", type=str, default=DEFAULT_END_DATE, help="End date (YYYY-MM-DD)")
     parser.add_argument("--threshold", type=int, default=2, help="Repetition threshold for spam detection")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse the whole export instead of using the cache")
+    parser.add_argument("--dir", type=str, help="Analyse every export in this directory (e.g. whatsapp_chats)")
+    parser.add_argument("--workers", type=int, default=0, help="Processes for --dir (default: one per CPU)")
     args = parser.parse_args()
 
+    if args.dir:
+        if not os.path.isdir(args.dir):
+            print(f"[ERROR] Chat directory not found: {args.dir}")
+            return
+        print(f"[INFO] Analysing chats in {args.dir} from {args.start} to {args.end}...")
+        report = analyse_directory(args.dir, args.start, args.end, args.threshold, args.workers,
+                                   use_cache=not args.no_cache)
+        print_directory_report(report)
+        return
+
     if not os.path.exists(args.chat):
         print(f"[ERROR] Chat file not found: {args.chat}")
         return
 
     print("[INFO] Loading chat...")
-    df = parse_chat(args.chat)
+    df = parse_chat(args.chat) if args.no_cache else load_chat(args.chat)
     df = filter_by_date(df, args.start, args.end)
 
     print(f"\n[INFO] Messages from {args.start} to {args.end}: {len(df)} total")
 
-    repeated = find_repeated_messages(df, threshold=args.threshold)
+    clusters = near_duplicate_clusters(df["message"])
+    repeated = find_repeated_messages(df, threshold=args.threshold, clusters=clusters)
     if not repeated.empty:
         print("\n[REPEAT] Repeated messages:")
         for msg, count in repeated.items():
-            safe_msg = msg[:40].encode("ascii", "ignore").decode("ascii")
-            print(f"   - {safe_msg}... ({count} times)")
+            print(f"   - {_safe(msg)}... ({count} times)")
     else:
         print("\n[OK] No repeated messages found!")
 
-    spammer, count = top_spammer(df)
-    print(f"\n[ALERT] Top spammer: {spammer} ({count} messages)")
+    spammer, count = top_spammer(df, threshold=args.threshold, clusters=clusters)
+    if spammer is not None:
+        print(f"\n[ALERT] Top spammer: {spammer} ({count} repeated messages)")
+    else:
+        print("\n[OK] No spammer found!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
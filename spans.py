@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Per-stage latency spans for the command pipeline.
+
+Each stage of a command (capture, transcribe, parse_command, match, dry_run,
+confirm_wait, execute) is timed with `span(stage)` and appended as one JSON line to
+AURA_SPAN_LOG, tagged with the request id of the enclosing `request()`. The request id
+lives in a context variable, so it follows asyncio tasks and asyncio.to_thread calls;
+code that hands work to its own threads passes the id along explicitly.
+
+Usage:
+    python spans.py [--window 1h] [--log logs/spans.jsonl]
+prints count and p50/p95/p99/max milliseconds per stage over the window.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+SPAN_LOG = os.getenv("AURA_SPAN_LOG", "logs/spans.jsonl")
+SPANS_ENABLED = os.getenv("AURA_SPANS", "1") != "0"
+STAGES = ("capture", "transcribe", "parse_command", "match", "dry_run", "confirm_wait", "execute")
+
+_request_id: ContextVar[str] = ContextVar("aura_request_id", default="")
+_write_lock = threading.Lock()
+_log_fh = None
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def current_request() -> str:
+    return _request_id.get()
+
+
+@contextmanager
+def request(request_id: Optional[str] = None) -> Iterator[str]:
+    """Tag spans recorded inside the block with a request id (reusing the active one if nested)."""
+    request_id = request_id or _request_id.get() or new_request_id()
+    token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _request_id.reset(token)
+
+
+def record(stage: str, ms: float, ok: bool = True, start: Optional[float] = None, **fields) -> None:
+    """Append one span line. Failures to write are never allowed to break a command."""
+    global _log_fh
+    if not SPANS_ENABLED:
+        return
+    entry = {"ts": round(start if start is not None else time.time() - ms / 1000, 3),
+             "request_id": _request_id.get() or new_request_id(), "stage": stage, "ms": round(ms, 3), "ok": ok}
+    entry.update(fields)
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    try:
+        with _write_lock:
+            if _log_fh is None:
+                os.makedirs(os.path.dirname(SPAN_LOG) or ".", exist_ok=True)
+                _log_fh = open(SPAN_LOG, "a", encoding="utf-8")
+            _log_fh.write(line)
+            _log_fh.flush()
+    except OSError:
+        pass
+
+
+@contextmanager
+def span(stage: str, **fields) -> Iterator[dict]:
+    """Time the block as one stage. The yielded dict can be filled with extra fields to log."""
+    start, t0 = time.time(), time.perf_counter()
+    ok = True
+    try:
+        yield fields
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        record(stage, (time.perf_counter() - t0) * 1000, ok=ok, start=start, **fields)
+
+
+def load_spans(path: str = SPAN_LOG, since: Optional[float] = None) -> List[dict]:
+    """Read spans from a JSONL log, skipping malformed lines and anything older than since (epoch seconds)."""
+    spans = []
+    if not os.path.exists(path):
+        return spans
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if since is None or entry.get("ts", 0) >= since:
+                spans.append(entry)
+    return spans
+
+
+def stage_percentiles(spans: List[dict]) -> Dict[str, Dict[str, float]]:
+    """count/p50/p95/p99/max ms per stage, plus "end_to_end" wall time per request id."""
+    import numpy as np
+
+    by_stage: Dict[str, List[float]] = {}
+    bounds: Dict[str, List[float]] = {}
+    for s in spans:
+        by_stage.setdefault(s["stage"], []).append(s["ms"])
+        lo_hi = bounds.setdefault(s["request_id"], [s["ts"], s["ts"] + s["ms"] / 1000])
+        lo_hi[0] = min(lo_hi[0], s["ts"])
+        lo_hi[1] = max(lo_hi[1], s["ts"] + s["ms"] / 1000)
+    if bounds:
+        by_stage["end_to_end"] = [(hi - lo) * 1000 for lo, hi in bounds.values()]
+
+    order = {name: i for i, name in enumerate(STAGES + ("end_to_end",))}
+    report = {}
+    for stage in sorted(by_stage, key=lambda name: (order.get(name, len(order)), name)):
+        values = np.asarray(by_stage[stage], dtype=np.float64)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        report[stage] = {"count": int(values.size), "p50": float(p50), "p95": float(p95),
+                         "p99": float(p99), "max": float(values.max())}
+    return report
+
+
+def parse_window(window: str) -> Optional[float]:
+    """"90s", "15m", "2h", "7d" (or bare seconds) -> seconds; "all" (or empty) -> None."""
+    text = (window or "all").strip().lower()
+    if text == "all":
+        return None
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    try:
+        seconds = float(text[:-1]) * units[text[-1]] if text[-1] in units else float(text)
+    except ValueError:
+        seconds = -1.0
+    if not seconds >= 0:
+        raise argparse.ArgumentTypeError(f"invalid window {window!r} (use e.g. 90s, 15m, 2h, 7d or all)")
+    return seconds
+
+
+def window_arg(window: str) -> str:
+    """argparse type for a report window: rejects bad values up front, keeps the text for the header."""
+    parse_window(window)
+    return window
+
+
+def print_report(window: str = "all", path: str = SPAN_LOG) -> int:
+    seconds = parse_window(window)
+    spans = load_spans(path, since=None if seconds is None else time.time() - seconds)
+    if not spans:
+        print(f"No spans in {path} for window {window}.")
+        return 1
+    print(f"{len({s['request_id'] for s in spans})} requests, {len(spans)} spans (window {window}, {path})")
+    print(f"{'stage':<14} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for stage, row in stage_percentiles(spans).items():
+        print(f"{stage:<14} {row['count']:>6} {row['p50']:>10.1f} {row['p95']:>10.1f} "
+              f"{row['p99']:>10.1f} {row['max']:>10.1f}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="AURA per-stage latency report")
+    parser.add_argument("--window", default="all", type=window_arg, help="Only spans newer than this (e.g. 15m, 2h, 7d, all)")
+    parser.add_argument("--log", default=SPAN_LOG, help=f"Span log to read (default: {SPAN_LOG})")
+    args = parser.parse_args()
+    return print_report(args.window, args.log)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
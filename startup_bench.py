@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for AURA's text-mode entry point.
+
+Runs `python -X importtime` on the modules text mode needs in a fresh interpreter,
+prints the slowest imports by cumulative time, and exits non-zero when the total
+exceeds the budget. Voice and LLM dependencies must stay out of this path.
+
+Usage:
+    python startup_bench.py [--budget-ms 500] [--top 15] [--module main ...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+IMPORT_BUDGET_MS = float(os.getenv("AURA_IMPORT_BUDGET_MS", "500"))
+TEXT_MODE_MODULES = ["main"]
+# modules that must never be imported on the text path
+FORBIDDEN = ("torch", "sounddevice", "faster_whisper", "scipy", "langchain_core", "sentence_transformers")
+
+
+def measure(modules: List[str]) -> List[Tuple[str, int, int]]:
+    """
+    Return (module, self_us, cumulative_us) for every import triggered by importing modules.
+    Nested imports keep importtime's leading indentation in the module name.
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {modules} failed:\n{proc.stderr}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.rstrip()[1:], int(self_us), int(cum_us)))  # keep nesting indent
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="AURA import-time budget check")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="Fail above this total import time")
+    parser.add_argument("--top", type=int, default=15, help="How many of the slowest imports to list")
+    parser.add_argument("--module", action="append", help="Module(s) to import (default: main)")
+    args = parser.parse_args()
+
+    rows = measure(args.module or TEXT_MODE_MODULES)
+    top_level = [r for r in rows if not r[0].startswith(" ")]
+    total_ms = sum(cum for _, _, cum in top_level) / 1000
+
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for name, self_us, cum_us in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{cum_us / 1000:14.1f}  {self_us / 1000:8.1f}  {name.strip()}")
+
+    loaded = {name.strip().split(".")[0] for name, _, _ in rows}
+    leaked = sorted(loaded.intersection(FORBIDDEN))
+    print(f"\nTotal import time: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if leaked:
+        print(f"[FAIL] Heavy modules imported on the text path: {', '.join(leaked)}")
+        return 1
+    if total_ms > args.budget_ms:
+        print("[FAIL] Import budget exceeded")
+        return 1
+    print("[OK] Within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,52 @@
+import ast
+import atexit
+import glob
+import hashlib
+import inspect
+import json
 import os
-import pickle
 import subprocess
 import sys
-from typing import List, Tuple, Optional
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
 
 # Embedding model name (pin here)
 EMBED_MODEL = "all-MiniLM-L6-v2"
 SCRIPTS_DIR = "scripts"
 INDEX_FILE = "script_index.txt"
-EMBED_FILE = "embeddings/script_embeddings.pkl"
+MANIFEST_FILE = "script_manifest.json"  # per-script docstring, entry point, signature, hash
+MANIFEST_VERSION = 1
+# Embedding store: JSON manifest + memory-mapped .npy matrix of L2-normalized rows
+EMBED_FILE = "embeddings/script_embeddings.json"
+EMBED_DTYPE = os.getenv("AURA_EMBED_DTYPE", "float32")  # "float32" or "float16"
+STORE_VERSION = 1
+# Query-embedding LRU cache (set AURA_QUERY_CACHE_FILE to persist it across runs)
+QUERY_CACHE_SIZE = int(os.getenv("AURA_QUERY_CACHE_SIZE", "256"))
+QUERY_CACHE_FILE = os.getenv("AURA_QUERY_CACHE_FILE", "")
+# Script execution: "subprocess" (fresh interpreter per run) or "pool" (pre-warmed workers)
+EXEC_MODE = os.getenv("AURA_EXEC_MODE", "subprocess")
+ISOLATED_SCRIPTS = {s for s in os.getenv("AURA_ISOLATED_SCRIPTS", "").split(",") if s}
+# Streamed script output: cap on forwarded bytes, and how many trailing lines are kept for the status
+STREAM_MAX_BYTES = int(os.getenv("AURA_STREAM_MAX_BYTES", str(1 << 20)))
+STREAM_TAIL_LINES = 20
+STREAM_READ_CHUNK = 1 << 16  # async pipe reads; a line longer than this is forwarded in pieces
+# Structured-intent (run_callable) execution: "thread" (in-process, cached module) or "process" (pool)
+CALLABLE_MODE = os.getenv("AURA_CALLABLE_MODE", "thread")
+CALLABLE_TIMEOUT = float(os.getenv("AURA_CALLABLE_TIMEOUT", "60"))
+CALLABLE_WORKERS = 4  # thread-mode calls in flight; beyond this, calls run in the process pool
+# Catalog size at which matching switches from exact scan to the approximate IVF index
+# (an exact scan of 10k rows is still under a millisecond, and IVF recall only gets good beyond that)
+ANN_MIN_SIZE = int(os.getenv("AURA_ANN_MIN_SIZE", "10000"))
 
 
-def _read_module_docstring(path: str) -> str:
-    """Return the module-level docstring or the first comment block if docstring absent."""
-    with open(path, "r", encoding="utf-8") as fh:
-        src = fh.read()
-    # naive detection of triple-quoted module docstring
-    src_strip = src.lstrip()
-    if src_strip.startswith(('"""', "'''")):
-        quote = src_strip[:3]
-        end = src_strip.find(quote, 3)
-        if end != -1:
-            return src_strip[3:end].strip()
-    # fallback: collect top consecutive comment lines
-    lines = src.splitlines()
+def _comment_header(src: str) -> str:
+    """Collect the top consecutive comment lines of a source file."""
     comments = []
-    for ln in lines:
+    for ln in src.splitlines():
         s = ln.strip()
+        if s.startswith("#!"):
+            continue
         if s.startswith("#"):
             comments.append(s.lstrip("#").strip())
         elif s == "":
@@ -36,11 +56,104 @@ def _read_module_docstring(path: str) -> str:
             continue
         else:
             break
-    return " ".join(comments) or os.path.basename(path)
+    return " ".join(comments)
+
+
+def _module_doc(tree: ast.Module, src: str, path: str) -> str:
+    """
+    Module docstring, else the first bare string literal among the leading imports/strings
+    (docstrings placed after imports), else the header comment block, else the filename.
+    """
+    doc = ast.get_docstring(tree)
+    if doc:
+        return doc.strip()
+    for node in tree.body:
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            return inspect.cleandoc(node.value.value)
+        if not isinstance(node, (ast.Import, ast.ImportFrom)):
+            break
+    return _comment_header(src) or os.path.basename(path)
+
+
+def _read_module_docstring(path: str) -> str:
+    """Return the module-level docstring or the first comment block if docstring absent."""
+    with open(path, "r", encoding="utf-8") as fh:
+        src = fh.read()
+    try:
+        tree = ast.parse(src, filename=path)
+    except SyntaxError:
+        return _comment_header(src) or os.path.basename(path)
+    return _module_doc(tree, src, path)
+
+
+def _entry_point(tree: ast.Module) -> Tuple[Optional[str], List[dict]]:
+    """Find main() (preferred) or run() at module level and describe its parameters."""
+    found = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name in ("main", "run"):
+            found[node.name] = node
+    node = found.get("main") or found.get("run")
+    if node is None:
+        return None, []
+
+    a = node.args
+    params: List[dict] = []
+
+    def _add(arg: ast.arg, kind: str, default: Optional[ast.expr]) -> None:
+        params.append({
+            "name": arg.arg,
+            "kind": kind,
+            "default": ast.unparse(default) if default is not None else None,
+            "required": default is None and kind in ("positional", "keyword"),
+            "annotation": ast.unparse(arg.annotation) if arg.annotation is not None else None,
+        })
+
+    positional = a.posonlyargs + a.args
+    defaults = [None] * (len(positional) - len(a.defaults)) + list(a.defaults)
+    for arg, default in zip(positional, defaults):
+        _add(arg, "positional", default)
+    if a.vararg is not None:
+        _add(a.vararg, "var_positional", None)
+    for arg, default in zip(a.kwonlyargs, a.kw_defaults):
+        _add(arg, "keyword", default)
+    if a.kwarg is not None:
+        _add(a.kwarg, "var_keyword", None)
+    return node.name, params
+
+
+def describe_script(path: str) -> dict:
+    """Manifest entry for one script: docstring, entry point and its parameters, content hash."""
+    st = os.stat(path)
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    src = raw.decode("utf-8", errors="replace")
+    entry: Optional[str] = None
+    params: List[dict] = []
+    try:
+        tree = ast.parse(src, filename=path)
+        doc = _module_doc(tree, src, path)
+        entry, params = _entry_point(tree)
+    except SyntaxError:
+        doc = _comment_header(src) or os.path.basename(path)
+    return {
+        "name": os.path.basename(path),
+        "path": path,
+        "hash": hashlib.sha256(raw).hexdigest(),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "doc": doc,
+        "entry": entry,
+        "params": params,
+    }
 
 
-def index_scripts(script_folder: str = SCRIPTS_DIR, index_file: str = INDEX_FILE) -> None:
-    """Write a whitelist of scripts (filenames) present in script_folder."""
+def index_scripts(script_folder: str = SCRIPTS_DIR, index_file: str = INDEX_FILE,
+                  manifest_file: str = MANIFEST_FILE) -> Dict[str, dict]:
+    """
+    Write a whitelist of scripts (filenames) present in script_folder, plus a JSON manifest
+    describing each one. Entries whose mtime and size are unchanged are reused without re-parsing.
+    Returns the manifest and installs it as the in-memory whitelist.
+    """
     os.makedirs(os.path.dirname(index_file) or ".", exist_ok=True)
     entries = []
     for file in sorted(os.listdir(script_folder)):
@@ -50,72 +163,498 @@ def index_scripts(script_folder: str = SCRIPTS_DIR, index_file: str = INDEX_FILE
         for e in entries:
             f.write(e + "\n")
 
+    previous = _read_manifest(manifest_file) or {}
+    manifest: Dict[str, dict] = {}
+    for name in entries:
+        path = os.path.join(script_folder, name)
+        st = os.stat(path)
+        old = previous.get(name)
+        if old and old.get("path") == path and old.get("mtime_ns") == st.st_mtime_ns and old.get("size") == st.st_size:
+            manifest[name] = old
+        else:
+            manifest[name] = describe_script(path)
+
+    os.makedirs(os.path.dirname(manifest_file) or ".", exist_ok=True)
+    tmp = manifest_file + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"version": MANIFEST_VERSION, "scripts": manifest}, fh, indent=1)
+    os.replace(tmp, manifest_file)
+    with _manifest_lock:
+        _manifest_state.clear()
+    return manifest
+
+
+def _read_manifest(manifest_file: str) -> Optional[Dict[str, dict]]:
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return None
+    return data.get("scripts") or {}
+
+
+_manifest_state: Dict[str, object] = {}
+_manifest_lock = threading.Lock()
+
+
+def get_manifest(index_file: str = INDEX_FILE, manifest_file: str = MANIFEST_FILE) -> Dict[str, dict]:
+    """
+    In-memory manifest restricted to the scripts whitelisted in index_file.
+    Both files are re-read only when their mtime/size change; scripts listed in the index but
+    missing from the manifest, or changed since it was written, are described on the fly.
+    """
+    def _stamp(p: str):
+        try:
+            st = os.stat(p)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    key = (index_file, manifest_file, _stamp(index_file), _stamp(manifest_file))
+    with _manifest_lock:
+        if _manifest_state.get("key") == key:
+            return _manifest_state["scripts"]
+        try:
+            with open(index_file, "r", encoding="utf-8") as f:
+                names = [ln.strip() for ln in f if ln.strip()]
+        except OSError:
+            names = []
+        stored = _read_manifest(manifest_file) or {}
+        scripts: Dict[str, dict] = {}
+        for name in names:
+            path = os.path.join(SCRIPTS_DIR, name)
+            info = stored.get(name)
+            if info is not None and _stamp(path) != (info.get("mtime_ns"), info.get("size")):
+                info = None  # edited since the manifest was written (or a manifest from elsewhere)
+            if info is None:
+                info = describe_script(path) if os.path.isfile(path) else None
+            if info is not None:
+                scripts[name] = info
+        _manifest_state.update(key=key, scripts=scripts)
+        return scripts
+
+
+def validate_args(script_name: str, args: Dict, index_file: str = INDEX_FILE) -> Tuple[Optional[Dict], str]:
+    """
+    Check structured-intent args against the script's entry-point signature without importing it.
+    Values for int/float/bool-annotated parameters are coerced from strings.
+    Returns (coerced_args, "") on success or (None, reason) on failure.
+    """
+    info = get_manifest(index_file).get(script_name)
+    if info is None:
+        return None, f"Script not allowed: {script_name}"
+    if info.get("entry") is None:
+        return (dict(args), "") if not args else (None, f"{script_name} has no main()/run() to accept arguments")
+
+    params = {p["name"]: p for p in info["params"]}
+    accepts_any = any(p["kind"] == "var_keyword" for p in info["params"])
+    unknown = [k for k in args if k not in params or params[k]["kind"].startswith("var_")]
+    if unknown and not accepts_any:
+        return None, f"Unknown argument(s) for {script_name}: {', '.join(sorted(unknown))}"
+    missing = [n for n, p in params.items() if p["required"] and n not in args]
+    if missing:
+        return None, f"Missing argument(s) for {script_name}: {', '.join(missing)}"
+
+    coerced = dict(args)
+    for name, value in args.items():
+        ann = params.get(name, {}).get("annotation")
+        if not isinstance(value, str) or ann not in ("int", "float", "bool"):
+            continue
+        try:
+            if ann == "bool":
+                coerced[name] = value.strip().lower() in ("1", "true", "yes", "on")
+            else:
+                coerced[name] = int(value) if ann == "int" else float(value)
+        except ValueError:
+            return None, f"Argument {name}={value!r} is not a valid {ann} for {script_name}"
+    return coerced, ""
+
+
+def _file_hash(path: str) -> str:
+    """Return the sha256 hex digest of a file's bytes, or "" if it does not exist."""
+    if not os.path.isfile(path):
+        return ""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _matrix_prefix(embed_file: str) -> str:
+    return os.path.splitext(embed_file)[0]
+
+
+def read_embed_store(embed_file: str = EMBED_FILE, mmap: bool = True) -> dict:
+    """
+    Load the embedding store manifest and its matrix (memory-mapped read-only by default).
+    Raises ValueError if the on-disk format version is not the one this code writes.
+    """
+    import numpy as np
+
+    with open(embed_file, "r", encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    version = manifest.get("version") if isinstance(manifest, dict) else None
+    if version != STORE_VERSION:
+        raise ValueError(f"Unsupported embedding store version {version!r} in {embed_file} "
+                         f"(expected {STORE_VERSION}); regenerate embeddings")
+    matrix_path = os.path.join(os.path.dirname(embed_file), manifest["matrix"])
+    matrix = np.load(matrix_path, mmap_mode="r" if mmap else None)
+    if matrix.shape[0] != len(manifest["scripts"]):
+        raise ValueError(f"Embedding matrix {matrix_path} has {matrix.shape[0]} rows, "
+                         f"manifest lists {len(manifest['scripts'])} scripts")
+    manifest["embeddings"] = matrix
+    return manifest
+
+
+def _load_embed_store(embed_file: str) -> Optional[dict]:
+    """Return the persisted store, or None if it is missing, unreadable or an older format."""
+    if not os.path.exists(embed_file):
+        return None
+    try:
+        return read_embed_store(embed_file)
+    except Exception:
+        return None
+
+
+def _write_embed_store(embed_file: str, manifest: dict, matrix) -> None:
+    """
+    Persist matrix under a content-addressed .npy name, then atomically swap in the manifest.
+    Readers holding the previous matrix mapped keep a consistent view; stale matrices are
+    removed best-effort (they may still be mapped on Windows).
+    """
+    import numpy as np
+
+    matrix = np.ascontiguousarray(matrix, dtype=EMBED_DTYPE)
+    prefix = _matrix_prefix(embed_file)
+    digest = hashlib.sha256(matrix.tobytes()).hexdigest()[:12]
+    matrix_path = f"{prefix}-{digest}.npy"
+    if not os.path.exists(matrix_path):
+        tmp = matrix_path + ".tmp"
+        with open(tmp, "wb") as fh:
+            np.save(fh, matrix)
+        os.replace(tmp, matrix_path)
+
+    manifest = dict(manifest, version=STORE_VERSION, dtype=str(matrix.dtype),
+                    dim=int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+                    matrix=os.path.basename(matrix_path))
+    tmp = embed_file + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1)
+    os.replace(tmp, embed_file)
+
+    for old in glob.glob(glob.escape(prefix) + "-*.npy"):
+        if os.path.abspath(old) != os.path.abspath(matrix_path):
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def generate_embeddings(index_file: str = INDEX_FILE, embed_file: str = EMBED_FILE,
+                        force: bool = False) -> int:
+    """
+    Bring the embedding store in line with the script index.
+    Only scripts whose content hash changed (or that are new) are re-encoded; entries for
+    scripts no longer indexed are dropped. Pass force=True to re-encode everything.
+    Returns the number of scripts encoded.
+    """
+    import numpy as np
 
-def generate_embeddings(index_file: str = INDEX_FILE, embed_file: str = EMBED_FILE) -> None:
-    """Generate embeddings from each script's module docstring and persist (scripts, docs, embeddings)."""
     os.makedirs(os.path.dirname(embed_file) or ".", exist_ok=True)
-    from sentence_transformers import SentenceTransformer
-    model = SentenceTransformer(EMBED_MODEL)
 
     with open(index_file, "r", encoding="utf-8") as f:
         scripts = [ln.strip() for ln in f if ln.strip()]
+    manifest = get_manifest(index_file)
+
+    previous = None if force else _load_embed_store(embed_file)
+    cached: Dict[str, Tuple[str, str, object]] = {}
+    if previous and previous.get("model") == EMBED_MODEL and "hashes" in previous:
+        for name, digest, doc, emb in zip(previous["scripts"], previous["hashes"],
+                                          previous["docs"], previous["embeddings"]):
+            cached[name] = (digest, doc, emb)
 
-    docs = []
-    paths = []
+    docs: List[str] = []
+    paths: List[str] = []
+    hashes: List[str] = []
+    rows: List[object] = []
+    stale: List[int] = []
     for script in scripts:
         path = os.path.join(SCRIPTS_DIR, script)
-        if not os.path.isfile(path):
-            docs.append("")  # preserve alignment
-            paths.append(path)
-            continue
-        docs.append(_read_module_docstring(path))
+        info = manifest.get(script)
+        # missing files keep an empty doc to preserve alignment
+        digest = info["hash"] if info else _file_hash(path)
+        doc = info["doc"] if info else (_read_module_docstring(path) if digest else "")
         paths.append(path)
+        hashes.append(digest)
+        docs.append(doc)
+        hit = cached.get(script)
+        if hit is not None and hit[0] == digest and hit[1] == doc:
+            rows.append(hit[2])
+            continue
+        rows.append(None)
+        stale.append(len(rows) - 1)
 
-    embeddings = model.encode(docs, show_progress_bar=True)
-    with open(embed_file, "wb") as fh:
-        pickle.dump({"scripts": scripts, "paths": paths, "docs": docs, "embeddings": embeddings}, fh)
+    if not stale and previous is not None and list(previous.get("scripts", [])) == scripts:
+        return 0
 
+    if stale:
+        model = get_matcher(embed_file).get_model()
+        fresh = model.encode([docs[i] for i in stale], show_progress_bar=len(stale) > 16)
+        for i, emb in zip(stale, fresh):
+            rows[i] = emb
 
-def match_command(user_input: str, embed_file: str = "embeddings/script_embeddings.pkl") -> Tuple[str, float, str]:
-    import numpy as np
-    from sklearn.metrics.pairwise import cosine_similarity
-    from sentence_transformers import SentenceTransformer
+    if rows:
+        embeddings = np.vstack(rows).astype(np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embeddings /= norms
+    else:
+        embeddings = np.zeros((0, 0), dtype=np.float32)
+    _write_embed_store(embed_file, {"model": EMBED_MODEL, "scripts": scripts, "paths": paths,
+                                    "docs": docs, "hashes": hashes}, embeddings)
+    return len(stale)
 
-    with open(embed_file, "rb") as fh:
-        data = pickle.load(fh)
 
-    scripts: List[str] = data["scripts"]
-    docs: List[str] = data["docs"]
-    embeddings = data["embeddings"]
+def normalize_utterance(text: str) -> str:
+    """Canonical form of an utterance for cache keys: lowercase, collapsed spaces, no edge punctuation."""
+    return " ".join(text.lower().split()).strip(" .,!?;:'\"")
 
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    input_emb = model.encode([user_input])
-    scores = cosine_similarity(input_emb, embeddings)[0]
-    best_idx = int(scores.argmax())
-    best_score = float(scores[best_idx])
-    return scripts[best_idx], best_score, docs[best_idx]
 
+class QueryCache:
+    """Bounded LRU of query embeddings keyed by normalized utterance, scoped to one embedding model."""
 
-def run_script(script_name: str, args: Optional[List[str]] = None, index_file: str = INDEX_FILE,
-               dry_run: bool = False, timeout: Optional[int] = None) -> Tuple[bool, str]:
+    def __init__(self, model_name: str, maxsize: int = QUERY_CACHE_SIZE, path: str = QUERY_CACHE_FILE):
+        self.model_name = model_name
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def get(self, key: str):
+        with self._lock:
+            vec = self._entries.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def put(self, key: str, vec) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = vec
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def load(self) -> None:
+        """Load persisted entries; files written for a different model are ignored."""
+        import numpy as np
+
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["model"]) != self.model_name:
+                    return
+                keys = json.loads(str(data["keys"]))
+                vectors = data["vectors"]
+                with self._lock:
+                    for key, vec in zip(keys[-self.maxsize:], vectors[-self.maxsize:]):
+                        self._entries[key] = np.array(vec)
+        except Exception:
+            return
+
+    def save(self) -> None:
+        """Persist entries in LRU order (no-op unless a cache path is configured)."""
+        import numpy as np
+
+        if not self.path:
+            return
+        with self._lock:
+            keys = list(self._entries)
+            vectors = np.array(list(self._entries.values()), dtype=np.float32)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, model=np.array(self.model_name), keys=np.array(json.dumps(keys)), vectors=vectors)
+        os.replace(tmp, self.path)
+
+
+class ScriptMatcher:
+    """Long-lived matcher that keeps the embedding model and a normalized embedding matrix resident."""
+
+    def __init__(self, embed_file: str = EMBED_FILE, model_name: str = EMBED_MODEL):
+        self.embed_file = embed_file
+        self.model_name = model_name
+        self._model = None
+        self._model_lock = threading.Lock()
+        self.query_cache = QueryCache(model_name)
+        if self.query_cache.path:
+            atexit.register(self.query_cache.save)
+        self._lock = threading.RLock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._digest: Optional[str] = None
+        self.scripts: List[str] = []
+        self.docs: List[str] = []
+        self.matrix = None  # memory-mapped (n_scripts, dim), rows L2-normalized
+        self.index = None  # IVFIndex once the catalog reaches ANN_MIN_SIZE
+
+    def get_model(self):
+        """Load the SentenceTransformer once and keep it for the lifetime of the matcher."""
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def warm_up(self) -> None:
+        """Load the model and run one encode; bypasses the query cache."""
+        self.get_model().encode(["warm up"], normalize_embeddings=True)
+
+    def _load_store(self) -> None:
+        with open(self.embed_file, "rb") as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+        if digest == self._digest:
+            return
+        data = read_embed_store(self.embed_file)
+        self.scripts = list(data["scripts"])
+        self.docs = list(data["docs"])
+        self.matrix = data["embeddings"]
+        self.index = None
+        if len(self.scripts) >= ANN_MIN_SIZE:
+            from vector_index import IVFIndex
+            self.index = IVFIndex(self.matrix)
+        self._digest = digest
+
+    def refresh(self) -> None:
+        """Reload the embedding store only if the file changed since the last load."""
+        with self._lock:
+            st = os.stat(self.embed_file)
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp == self._stamp and self.matrix is not None:
+                return
+            self._load_store()
+            self._stamp = stamp
+
+    def encode(self, text: str):
+        """Return the L2-normalized embedding of a single query string, served from the LRU when seen."""
+        return self.encode_batch([text])[0]
+
+    def encode_batch(self, texts: List[str]):
+        """Embed many queries with one model.encode call for the cache misses; returns (n, dim)."""
+        import numpy as np
+
+        keys = [normalize_utterance(t) for t in texts]
+        vecs = [self.query_cache.get(key) for key in keys]
+        missing = [i for i, vec in enumerate(vecs) if vec is None]
+        if missing:
+            fresh = self.get_model().encode([texts[i] for i in missing], normalize_embeddings=True)
+            for i, vec in zip(missing, fresh):
+                vecs[i] = vec
+                self.query_cache.put(keys[i], vec)
+        return np.vstack(vecs) if vecs else np.zeros((0, 0), dtype=np.float32)
+
+    def search(self, user_input: str, k: int = 5) -> List[Tuple[str, float, str]]:
+        """Return up to k (script, cosine score, docstring) candidates, best first."""
+        return self.search_batch([user_input], k)[0]
+
+    def search_batch(self, texts: List[str], k: int = 5) -> List[List[Tuple[str, float, str]]]:
+        """Top-k candidates for each text, encoding all of them in one batch."""
+        from vector_index import top_k
+
+        with self._lock:
+            self.refresh()
+            matrix, index, scripts, docs = self.matrix, self.index, self.scripts, self.docs
+        if matrix is None or matrix.shape[0] == 0:
+            return [[] for _ in texts]
+        queries = self.encode_batch(texts)
+        if index is not None:
+            ranked = [index.search(q, k) for q in queries]
+        else:
+            scores = queries @ matrix.T if len(texts) else queries
+            ranked = [top_k(row, k) for row in scores]
+        return [[(scripts[i], float(sc), docs[i]) for i, sc in zip(idx, row_scores)]
+                for idx, row_scores in ranked]
+
+    def match(self, user_input: str) -> Tuple[str, float, str]:
+        """Return (script, cosine score, docstring) for the best match."""
+        hits = self.search(user_input, k=1)
+        if not hits:
+            raise ValueError("Embedding store is empty; index some scripts first")
+        return hits[0]
+
+
+_matchers: Dict[str, ScriptMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_matcher(embed_file: str = EMBED_FILE) -> ScriptMatcher:
+    """Return the process-wide ScriptMatcher for embed_file, creating it on first use."""
+    with _matchers_lock:
+        matcher = _matchers.get(embed_file)
+        if matcher is None:
+            matcher = _matchers[embed_file] = ScriptMatcher(embed_file)
+        return matcher
+
+
+def match_command(user_input: str, embed_file: str = EMBED_FILE) -> Tuple[str, float, str]:
+    return get_matcher(embed_file).match(user_input)
+
+
+def script_entry_params(script_name: str, index_file: str = INDEX_FILE) -> List[str]:
     """
-    Securely run a whitelisted script via subprocess.
-    Returns (success, output_or_error).
+    Parameter names of the script's main()/run() entry point, taken from the manifest (no import).
+    Scripts without such an entry point run as plain subprocesses and take no arguments.
     """
-    args = args or []
-    # validate script against index whitelist
-    with open(index_file, "r", encoding="utf-8") as f:
-        allowed = {ln.strip() for ln in f if ln.strip()}
-    if script_name not in allowed:
-        return False, f"Script not allowed: {script_name}"
+    info = get_manifest(index_file).get(script_name)
+    if info is None:
+        raise KeyError(f"Script not allowed: {script_name}")
+    return [p["name"] for p in info["params"]]
+
 
+def _resolve_script(script_name: str, index_file: str = INDEX_FILE) -> Tuple[Optional[str], str]:
+    """Validate script_name against the in-memory whitelist; return (path, "") or (None, error)."""
+    if script_name not in get_manifest(index_file):
+        return None, f"Script not allowed: {script_name}"
     script_path = os.path.join(SCRIPTS_DIR, script_name)
     if not os.path.isfile(script_path):
-        return False, f"Script not found: {script_path}"
+        return None, f"Script not found: {script_path}"
+    return script_path, ""
+
+
+def run_script(script_name: str, args: Optional[List[str]] = None, index_file: str = INDEX_FILE,
+               dry_run: bool = False, timeout: Optional[int] = None, mode: str = "") -> Tuple[bool, str]:
+    """
+    Securely run a whitelisted script via subprocess, or in a pre-warmed worker process when
+    mode (default AURA_EXEC_MODE) is "pool". Scripts listed in AURA_ISOLATED_SCRIPTS always
+    get a fresh subprocess.
+    Returns (success, output_or_error).
+    """
+    args = args or []
+    script_path, error = _resolve_script(script_name, index_file)
+    if script_path is None:
+        return False, error
 
     if dry_run:
         return True, f"[dry-run] Would run: {sys.executable} {script_path} {' '.join(args)}"
 
+    mode = mode or EXEC_MODE
+    if mode == "pool" and script_name not in ISOLATED_SCRIPTS:
+        return _run_in_pool(script_path, args, timeout)
+
     cmd = [sys.executable, script_path] + args
     try:
         completed = subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=timeout)
@@ -127,31 +666,283 @@ def run_script(script_name: str, args: Optional[List[str]] = None, index_file: s
     except Exception as e:
         return False, f"Execution error: {e}"
     
-def run_callable(script_name: str, args: dict, index_file: str = INDEX_FILE) -> Tuple[bool, str]:
-    """Attempt to run a whitelisted script via direct Python import and function call."""
-    import importlib.util
-    import inspect
+def _child_env() -> Dict[str, str]:
+    """Environment for streamed scripts: unbuffered so lines arrive live, UTF-8 so emoji output can't crash."""
+    env = dict(os.environ)
+    env.setdefault("PYTHONUNBUFFERED", "1")
+    env.setdefault("PYTHONIOENCODING", "utf-8")
+    return env
 
-    # Validate whitelist
-    with open(index_file, "r", encoding="utf-8") as f:
-        allowed = {ln.strip() for ln in f if ln.strip()}
-    if script_name not in allowed:
-        return False, f"Script not allowed: {script_name}"
 
-    script_path = os.path.join(SCRIPTS_DIR, script_name)
-    if not os.path.isfile(script_path):
-        return False, f"Script not found: {script_path}"
+class _LineSplitter:
+    """Split raw pipe chunks into decoded lines; text without a newline is cut every `limit` bytes."""
+
+    def __init__(self, limit: int = STREAM_READ_CHUNK):
+        self.limit = limit
+        self.pending = b""
+
+    def push(self, chunk: bytes) -> List[str]:
+        lines = (self.pending + chunk).split(b"\n")
+        self.pending = lines.pop()
+        if len(self.pending) >= self.limit:
+            lines.append(self.pending)
+            self.pending = b""
+        return [raw.decode("utf-8", errors="replace") for raw in lines]
+
+    def flush(self) -> List[str]:
+        rest, self.pending = self.pending, b""
+        return [rest.decode("utf-8", errors="replace")] if rest else []
+
+
+class _OutputSink:
+    """Forward output lines to a callback up to a byte cap, keeping only a short tail in memory."""
+
+    def __init__(self, on_line: Callable[[str, str], None], max_bytes: int = STREAM_MAX_BYTES,
+                 tail_lines: int = STREAM_TAIL_LINES):
+        self.on_line = on_line
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.truncated = False
+        self.tail: Dict[str, deque] = {"stdout": deque(maxlen=tail_lines), "stderr": deque(maxlen=tail_lines)}
+
+    def feed(self, stream: str, line: str) -> None:
+        line = line.rstrip("\r\n")
+        self.tail[stream].append(line[:self.max_bytes])
+        if self.truncated:
+            return
+        self.bytes += len(line) + 1
+        if self.bytes > self.max_bytes:
+            self.truncated = True
+            self.on_line("stderr", f"[output truncated after {self.max_bytes} bytes]")
+            return
+        self.on_line(stream, line)
+
+    def result(self, returncode: Optional[int], timeout: Optional[float] = None) -> Tuple[bool, str]:
+        if returncode is None:
+            return False, f"Execution error: timed out after {timeout}s"
+        if returncode != 0:
+            err = self._tail_text("stderr") or f"exit code {returncode}"
+            return False, f"Script failed: {err}"
+        return True, self._tail_text("stdout") or "<no output>"
+
+    def _tail_text(self, stream: str) -> str:
+        return "\n".join(self.tail[stream]).strip()[-self.max_bytes:]
+
+
+class ScriptStream:
+    """
+    Iterate a whitelisted script's output as (stream, line) pairs while it runs.
+    After iteration, ok/message hold the final status (message is the output tail, not the
+    whole output). Lines beyond max_bytes are dropped but the script runs to completion.
+    """
+
+    def __init__(self, script_name: str, args: Optional[List[str]] = None, index_file: str = INDEX_FILE,
+                 timeout: Optional[float] = None, max_bytes: int = STREAM_MAX_BYTES):
+        self.script_name = script_name
+        self.args = args or []
+        self.index_file = index_file
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.ok: Optional[bool] = None
+        self.message = ""
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        import queue
+        import time
+
+        script_path, error = _resolve_script(self.script_name, self.index_file)
+        if script_path is None:
+            self.ok, self.message = False, error
+            return
+        try:
+            proc = subprocess.Popen([sys.executable, script_path] + self.args, stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, env=_child_env())
+        except Exception as e:
+            self.ok, self.message = False, f"Execution error: {e}"
+            return
+
+        lines: "queue.Queue[Tuple[str, Optional[str]]]" = queue.Queue()
+
+        def _pump(name: str, fh) -> None:
+            # fixed-size reads, so one huge line is never held whole
+            splitter = _LineSplitter()
+            for chunk in iter(lambda: fh.read1(STREAM_READ_CHUNK), b""):
+                for line in splitter.push(chunk):
+                    lines.put((name, line))
+            for line in splitter.flush():
+                lines.put((name, line))
+            lines.put((name, None))
+
+        for name, fh in (("stdout", proc.stdout), ("stderr", proc.stderr)):
+            threading.Thread(target=_pump, args=(name, fh), daemon=True).start()
+
+        pending: List[Tuple[str, str]] = []
+        sink = _OutputSink(lambda stream, line: pending.append((stream, line)), self.max_bytes)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        open_streams = 2
+        returncode: Optional[int] = None
+        try:
+            while open_streams:
+                wait = None if deadline is None else deadline - time.monotonic()
+                if wait is not None and wait <= 0:
+                    raise subprocess.TimeoutExpired(proc.args, self.timeout)
+                try:
+                    name, line = lines.get(timeout=wait)
+                except queue.Empty:
+                    continue
+                if line is None:
+                    open_streams -= 1
+                    continue
+                sink.feed(name, line)
+                while pending:
+                    yield pending.pop(0)
+            returncode = proc.wait()
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        finally:
+            if proc.poll() is None:  # consumer stopped iterating early
+                proc.kill()
+                proc.wait()
+        self.ok, self.message = sink.result(returncode, self.timeout)
+
+
+def run_script_streaming(script_name: str, on_line: Callable[[str, str], None], args: Optional[List[str]] = None,
+                         index_file: str = INDEX_FILE, timeout: Optional[float] = None,
+                         max_bytes: int = STREAM_MAX_BYTES) -> Tuple[bool, str]:
+    """Run a script, calling on_line(stream, line) as output arrives. Returns (success, status/tail)."""
+    stream = ScriptStream(script_name, args, index_file, timeout, max_bytes)
+    for name, line in stream:
+        on_line(name, line)
+    return bool(stream.ok), stream.message
+
+
+async def run_script_async(script_name: str, args: Optional[List[str]] = None, index_file: str = INDEX_FILE,
+                           timeout: Optional[float] = None, on_line: Optional[Callable[[str, str], None]] = None,
+                           max_bytes: int = STREAM_MAX_BYTES) -> Tuple[bool, str]:
+    """
+    Awaitable counterpart of run_script: the script runs via asyncio.create_subprocess_exec so
+    other commands keep progressing. With on_line, output is streamed line by line (capped at
+    max_bytes) instead of being buffered. Pool mode defers to run_script on a worker thread.
+    """
+    import asyncio
+
+    args = args or []
+    script_path, error = _resolve_script(script_name, index_file)
+    if script_path is None:
+        return False, error
+    if EXEC_MODE == "pool" and script_name not in ISOLATED_SCRIPTS:
+        ok, out = await asyncio.to_thread(_run_in_pool, script_path, args, timeout)
+        if on_line is not None and ok:  # workers buffer output; replay it so callers see it once
+            sink = _OutputSink(on_line, max_bytes)
+            for line in out.splitlines():
+                sink.feed("stdout", line)
+        return ok, out
+
+    try:
+        proc = await asyncio.create_subprocess_exec(sys.executable, script_path, *args,
+                                                    stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.PIPE,
+                                                    env=_child_env() if on_line else None)
+    except Exception as e:
+        return False, f"Execution error: {e}"
+
+    if on_line is not None:
+        sink = _OutputSink(on_line, max_bytes)
+
+        async def _pump(name: str, reader) -> None:
+            # read fixed-size chunks rather than readline(), which raises on lines over the reader limit
+            splitter = _LineSplitter()
+            while True:
+                chunk = await reader.read(STREAM_READ_CHUNK)
+                if not chunk:
+                    break
+                for line in splitter.push(chunk):
+                    sink.feed(name, line)
+            for line in splitter.flush():
+                sink.feed(name, line)
+
+        try:
+            await asyncio.wait_for(asyncio.gather(_pump("stdout", proc.stdout), _pump("stderr", proc.stderr),
+                                                  proc.wait()), timeout)
+        except asyncio.TimeoutError:
+            return sink.result(None, timeout)
+        finally:
+            if proc.returncode is None:  # timeout, cancellation or a failing callback
+                proc.kill()
+                await proc.wait()
+        return sink.result(proc.returncode)
+
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        return False, f"Execution error: timed out after {timeout}s"
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+    out = stdout.decode(errors="replace").strip()
+    if proc.returncode != 0:
+        err = stderr.decode(errors="replace").strip() or f"exit code {proc.returncode}"
+        return False, f"Script failed: {err}"
+    return True, out or "<no output>"
+
+
+def _run_in_pool(script_path: str, args: List[str], timeout: Optional[int]) -> Tuple[bool, str]:
+    from worker_pool import get_pool
 
     try:
-        # Load module dynamically
-        spec = importlib.util.spec_from_file_location("target_module", script_path)
+        code, out, err = get_pool().run(script_path, args, timeout=timeout)
+    except Exception as e:
+        return False, f"Execution error: {e}"
+    if code != 0:
+        return False, f"Script failed: {err.strip() or f'exit code {code}'}"
+    return True, out.strip() or "<no output>"
+
+
+_module_cache: Dict[str, Tuple[Tuple[int, int], str, object]] = {}
+_module_lock = threading.Lock()
+# separate from _module_lock, which is held while a script's top-level code runs
+_executor_lock = threading.Lock()
+_callable_executor = None
+_callable_busy = 0  # submitted thread-mode calls not yet finished, including timed-out ones
+
+
+def load_script_module(script_path: str):
+    """
+    Import a script as a module, reusing the cached module while its content is unchanged.
+    The file is re-hashed only when its mtime/size change, and re-executed only if the hash differs.
+    """
+    import importlib.util
+
+    path = os.path.abspath(script_path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _module_lock:
+        cached = _module_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[2]
+        digest = _file_hash(path)
+        if cached is not None and cached[1] == digest:
+            _module_cache[path] = (stamp, digest, cached[2])
+            return cached[2]
+        name = "aura_script_" + os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(name, path)
         mod = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(mod)
+        _module_cache[path] = (stamp, digest, mod)
+        return mod
+
+
+def call_entry(script_path: str, args: dict) -> Tuple[bool, str]:
+    """Load (or reuse) a script module and call its main()/run() with signature-checked args."""
+    try:
+        mod = load_script_module(script_path)
 
         # Find callable entry point
         entry = getattr(mod, "main", None) or getattr(mod, "run", None)
         if not callable(entry):
-            return False, f"No callable entry point found in {script_name}"
+            return False, f"No callable entry point found in {os.path.basename(script_path)}"
 
         # Validate signature
         sig = inspect.signature(entry)
@@ -162,4 +953,68 @@ def run_callable(script_name: str, args: dict, index_file: str = INDEX_FILE) ->
         result = entry(**bound.arguments)
         return True, str(result) if result is not None else "<no output>"
     except Exception as e:
-        return False, f"Callable execution error: {e}"
\ No newline at end of file
+        return False, f"Callable execution error: {e}"
+
+
+def _get_callable_executor():
+    global _callable_executor
+    with _executor_lock:
+        if _callable_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _callable_executor = ThreadPoolExecutor(max_workers=CALLABLE_WORKERS, thread_name_prefix="aura-callable")
+        return _callable_executor
+
+
+def _claim_callable_thread() -> bool:
+    global _callable_busy
+    with _executor_lock:
+        if _callable_busy >= CALLABLE_WORKERS:
+            return False
+        _callable_busy += 1
+        return True
+
+
+def _release_callable_thread(_future=None) -> None:
+    global _callable_busy
+    with _executor_lock:
+        _callable_busy -= 1
+
+
+def run_callable(script_name: str, args: dict, index_file: str = INDEX_FILE,
+                 timeout: Optional[float] = None, mode: str = "") -> Tuple[bool, str]:
+    """
+    Attempt to run a whitelisted script via direct Python import and function call.
+    mode "thread" (default AURA_CALLABLE_MODE) calls the entry point on an executor thread in
+    this process, reusing the cached module; a timed-out call is reported but cannot be killed,
+    so it keeps its thread until it returns. Once all CALLABLE_WORKERS threads are taken (by
+    running or timed-out calls), further calls use process mode instead of queueing behind them.
+    mode "process" runs it in a pre-warmed pool worker, which is killed and replaced on timeout.
+    """
+    from concurrent.futures import TimeoutError as FutureTimeout
+
+    # Validate whitelist
+    script_path, error = _resolve_script(script_name, index_file)
+    if script_path is None:
+        return False, error
+
+    timeout = CALLABLE_TIMEOUT if timeout is None else timeout
+    mode = mode or CALLABLE_MODE
+    if mode != "process" and not _claim_callable_thread():
+        mode = "process"
+    if mode == "process":
+        from worker_pool import get_pool
+        try:
+            return get_pool().call(script_path, args, timeout=timeout)
+        except Exception as e:
+            return False, f"Callable execution error: {e}"
+
+    try:
+        future = _get_callable_executor().submit(call_entry, script_path, args)
+    except Exception:
+        _release_callable_thread()
+        raise
+    future.add_done_callback(_release_callable_thread)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        return False, f"Callable timed out after {timeout}s (still running in the background)"
@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+# keep test runs out of the real logs
+os.environ.setdefault("AURA_DISPATCH_LOG", os.path.join(ROOT, ".pytest_cache", "dispatch.log"))
+os.environ.setdefault("AURA_SPANS", "0")
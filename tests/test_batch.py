@@ -0,0 +1,49 @@
+import io
+import json
+
+import batch
+
+
+def test_read_commands_skips_malformed_lines():
+    lines = ['"take a screenshot"', "", "not json", "123", '["a"]', '{"id": "x", "text": "tile windows"}',
+             '{"note": "no text"}', '{"command": "set a timer"}']
+    assert list(batch.read_commands(io.StringIO("\n".join(lines)))) == [
+        ("1", "take a screenshot"), ("x", "tile windows"), ("8", "set a timer")]
+
+
+class _Matcher:
+    scores = {"shot": ("screenshot_taker.py", 0.9), "tile": ("screen_tiler_grid.py", 0.9),
+              "vague": ("screenshot_taker.py", 0.2)}
+
+    def search_batch(self, texts, k=1):
+        return [[(*self.scores[t], "")] if t in self.scores else [] for t in texts]
+
+
+def _run(monkeypatch, **policy):
+    ran = []
+
+    def fake_run_script(script, args=None, dry_run=False, timeout=None):
+        if not dry_run:
+            ran.append(script)
+        return True, f"{'[DRY RUN] ' if dry_run else ''}{script}"
+
+    monkeypatch.setattr(batch, "get_matcher", lambda: _Matcher())
+    monkeypatch.setattr(batch, "run_script", fake_run_script)
+    out = io.StringIO()
+    commands = [("1", "shot"), ("2", "tile"), ("3", "vague"), ("4", "unknown")]
+    counts = batch.run_batch(commands, out, threshold=0.75, workers=2, **policy)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    return counts, {r["id"]: r["status"] for r in records}, ran
+
+
+def test_allow_list_policy(monkeypatch):
+    counts, status, ran = _run(monkeypatch, allow={"screenshot_taker.py"})
+    assert status == {"1": "ok", "2": "skipped_not_allowed", "3": "skipped_low_confidence", "4": "no_match"}
+    assert ran == ["screenshot_taker.py"]
+    assert counts == {"ok": 1, "skipped_not_allowed": 1, "skipped_low_confidence": 1, "no_match": 1}
+
+
+def test_auto_approve_still_requires_confidence(monkeypatch):
+    _, status, ran = _run(monkeypatch, auto_approve=True)
+    assert status == {"1": "ok", "2": "ok", "3": "skipped_low_confidence", "4": "no_match"}
+    assert sorted(ran) == ["screen_tiler_grid.py", "screenshot_taker.py"]
@@ -0,0 +1,93 @@
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+import daemon
+
+
+class _StubDaemon:
+    def health(self):
+        return {"ok": True}
+
+    def plan(self, text):
+        return {"text": text}
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon, "SERVE_TOKEN", "")
+    monkeypatch.setattr(daemon, "SERVE_TOKEN_FILE", str(tmp_path / "aura" / "serve_token"))
+    srv = daemon.make_server(_StubDaemon(), "127.0.0.1", 0)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _post(srv, path, body=b"{}", headers=None):
+    port = srv.server_address[1]
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("POST", path, body=body, headers=headers or {})
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read() or b"{}")
+
+
+def _ok_headers(srv):
+    return {"X-Aura-Token": srv.RequestHandlerClass.token, "Content-Type": "application/json"}
+
+
+def test_token_is_generated_into_user_only_file(server):
+    path = daemon.SERVE_TOKEN_FILE
+    with open(path, encoding="utf-8") as f:
+        assert f.read().strip() == server.RequestHandlerClass.token
+    assert os.stat(path).st_mode & 0o077 == 0
+
+
+def test_command_with_token_and_json(server):
+    status, payload = _post(server, "/command", json.dumps({"text": "hi"}).encode(), _ok_headers(server))
+    assert status == 200 and payload == {"text": "hi"}
+
+
+def test_missing_token_is_rejected(server):
+    headers = _ok_headers(server)
+    del headers["X-Aura-Token"]
+    assert _post(server, "/command", b'{"text": "hi"}', headers)[0] == 403
+
+
+def test_foreign_host_is_rejected(server):
+    headers = dict(_ok_headers(server), Host=f"evil.example:{server.server_address[1]}")
+    assert _post(server, "/command", b'{"text": "hi"}', headers)[0] == 403
+
+
+def test_simple_cross_site_post_is_rejected(server):
+    headers = dict(_ok_headers(server), **{"Content-Type": "text/plain"})
+    assert _post(server, "/command", b'{"text": "hi"}', headers)[0] == 415
+
+
+@pytest.mark.parametrize("body", [b"123", b'["a"]', b'"text"', b"{not json"])
+def test_non_object_json_is_a_bad_request(server, body):
+    status, payload = _post(server, "/command", body, _ok_headers(server))
+    assert status == 400 and "error" in payload
+
+
+def test_invalid_wav_is_a_bad_request(server):
+    headers = dict(_ok_headers(server), **{"Content-Type": "audio/wav"})
+    status, payload = _post(server, "/audio", b"RIFF\x00\x00not really a wav file", headers)
+    assert status == 400 and payload["error"].startswith("Invalid WAV audio")
+
+
+def test_load_survives_embedding_failure(monkeypatch):
+    import sys
+    import types
+
+    calls = []
+    monkeypatch.setattr(daemon.tm, "index_scripts", lambda: calls.append("index"))
+    monkeypatch.setattr(daemon.tm, "generate_embeddings", lambda: (_ for _ in ()).throw(OSError("offline")))
+    monkeypatch.setattr(daemon.tm, "get_manifest", lambda: calls.append("manifest"))
+    monkeypatch.setitem(sys.modules, "warmup", types.SimpleNamespace(start_warmup=lambda voice: "warm"))
+    d = daemon.Daemon()
+    d.load(voice=False)
+    assert calls == ["index", "manifest"] and d.warm == "warm"
@@ -0,0 +1,51 @@
+import os
+import select
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+
+from conftest import ROOT
+
+CHILD = textwrap.dedent("""
+    import dispatcher
+
+    class _Cache:
+        def stats(self):
+            return {}
+
+    class _Matcher:
+        query_cache = _Cache()
+
+    dispatcher.get_matcher = lambda: _Matcher()
+    dispatcher.run_script = lambda *a, **k: (True, "[DRY RUN] would run x.py")
+    print(dispatcher.dispatch("do it", candidates=[("x.py", 0.99, "")]), flush=True)
+""")
+
+
+def _read_until(proc, marker: str, timeout: float) -> str:
+    out, deadline = b"", time.monotonic() + timeout
+    while marker.encode() not in out and time.monotonic() < deadline:
+        ready, _, _ = select.select([proc.stdout], [], [], 0.1)
+        if ready:
+            chunk = os.read(proc.stdout.fileno(), 4096)
+            if not chunk:
+                break
+            out += chunk
+    return out.decode()
+
+
+def test_ctrl_c_at_confirm_prompt_aborts_promptly():
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.Popen([sys.executable, "-c", CHILD], cwd=ROOT, env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    try:
+        assert "Type YES to confirm" in _read_until(proc, "Type YES to confirm", 30)
+        os.kill(proc.pid, signal.SIGINT)
+        out, _ = proc.communicate(timeout=4)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    assert "(False, 'Execution aborted by user.')" in out.decode()
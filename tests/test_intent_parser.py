@@ -0,0 +1,66 @@
+import pytest
+
+import intent_parser as ip
+import task_matcher as tm
+
+
+@pytest.fixture
+def index_file(tmp_path):
+    path = tmp_path / "script_index.txt"
+    path.write_text("take_screenshot.py\n")
+    return path
+
+
+def _cache(tmp_path, index_file, **kwargs):
+    return ip.IntentCache(str(tmp_path / "intents.sqlite"), index_file=str(index_file), **kwargs)
+
+
+def test_entries_expire_after_ttl(tmp_path, index_file, monkeypatch):
+    cache = _cache(tmp_path, index_file, ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr(ip.time, "time", lambda: now[0])
+    cache.put("Take a screenshot", "take_screenshot.py", {})
+    assert cache.get("take a screenshot!") == ("take_screenshot.py", {})
+    now[0] += 61
+    assert cache.get("take a screenshot") is None
+
+
+def test_index_change_invalidates_entries(tmp_path, index_file):
+    cache = _cache(tmp_path, index_file)
+    cache.put("take a screenshot", "take_screenshot.py", {})
+    index_file.write_text("take_screenshot.py\nother.py\n")
+    assert cache.get("take a screenshot") is None
+
+
+def test_size_limit_evicts_least_recently_used(tmp_path, index_file, monkeypatch):
+    cache = _cache(tmp_path, index_file, max_entries=2)
+    now = [1000.0]
+    monkeypatch.setattr(ip.time, "time", lambda: now[0])
+    for text in ("one", "two", "three"):
+        now[0] += 1
+        cache.put(text, "take_screenshot.py", {"n": text})
+    assert cache.get("one") is None
+    assert cache.get("two") == ("take_screenshot.py", {"n": "two"})
+    assert cache.get("three") == ("take_screenshot.py", {"n": "three"})
+
+
+def test_invalid_llm_answers_are_not_cached(tmp_path, index_file, monkeypatch):
+    cache = _cache(tmp_path, index_file)
+    calls = []
+
+    class _Chain:
+        def invoke(self, payload):
+            calls.append(payload)
+            return {"script": "take_screenshot.py", "args": {}}
+
+    monkeypatch.setattr(ip, "get_chain", lambda: _Chain())
+    monkeypatch.setattr(ip, "get_intent_cache", lambda: cache)
+    monkeypatch.setattr(tm, "validate_args", lambda script, args: (None, f"Script not allowed: {script}"))
+    assert ip.parse_command_with_source("take a screenshot") == (("take_screenshot.py", {}), "llm")
+    assert ip.parse_command_with_source("take a screenshot") == (("take_screenshot.py", {}), "llm")
+    assert len(calls) == 2
+
+    monkeypatch.setattr(tm, "validate_args", lambda script, args: (dict(args), ""))
+    ip.parse_command_with_source("take a screenshot")
+    assert ip.parse_command_with_source("take a screenshot") == (("take_screenshot.py", {}), "intent_cache")
+    assert len(calls) == 3
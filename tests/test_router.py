@@ -0,0 +1,37 @@
+import pytest
+
+import intent_parser
+import router
+
+
+class _Matcher:
+    def search(self, text, k=3):
+        return [("screenshot_taker.py", 0.4, "Take a screenshot"), ("screen_tiler_grid.py", 0.3, "")]
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(router, "_tier_counts", router.Counter())
+    monkeypatch.setattr(router, "get_matcher", lambda: _Matcher())
+
+
+def _llm_answers(monkeypatch, script, args, source="llm"):
+    monkeypatch.setattr(intent_parser, "parse_command_with_source", lambda text: ((script, args), source))
+
+
+def test_invalid_llm_script_falls_back_to_embedding_candidates(monkeypatch):
+    _llm_answers(monkeypatch, "not_whitelisted.py", {})
+    monkeypatch.setattr(router, "validate_args", lambda s, a: (None, f"Script not allowed: {s}"))
+    r = router.route("take a screenshot")
+    assert r.tier == "embedding_fallback" and r.script is None
+    assert [name for name, _, _ in r.candidates] == ["screenshot_taker.py", "screen_tiler_grid.py"]
+    stats = router.tier_stats()
+    assert stats["embedding_fallback"] == 1 and stats["llm_avoided"] == 0.0
+
+
+def test_valid_cached_intent_is_routed_with_checked_args(monkeypatch):
+    _llm_answers(monkeypatch, "voice_reminder_timer.py", {"minutes": "5"}, source="intent_cache")
+    monkeypatch.setattr(router, "validate_args", lambda s, a: ({"minutes": 5}, ""))
+    r = router.route("remind me in 5 minutes")
+    assert (r.tier, r.script, r.args) == ("intent_cache", "voice_reminder_timer.py", {"minutes": 5})
+    assert router.tier_stats()["llm_avoided"] == 1.0
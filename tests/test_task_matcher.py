@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import task_matcher as tm
+
+
+def _script(tmp_path, monkeypatch, body: str) -> str:
+    path = tmp_path / "noisy.py"
+    path.write_text(body)
+    monkeypatch.setattr(tm, "_resolve_script", lambda name, index_file=tm.INDEX_FILE: (str(path), ""))
+    monkeypatch.setattr(tm, "EXEC_MODE", "subprocess")
+    return "noisy.py"
+
+
+def test_stream_survives_line_longer_than_reader_limit(tmp_path, monkeypatch):
+    name = _script(tmp_path, monkeypatch, "import sys\nsys.stdout.write('x' * 200_000)\nprint()\nprint('done')\n")
+    lines = []
+    ok, out = asyncio.run(tm.run_script_async(name, on_line=lambda stream, line: lines.append((stream, line))))
+    assert ok and out.endswith("done")
+    assert sum(len(line) for stream, line in lines if stream == "stdout" and line != "done") == 200_000
+
+
+def test_stream_cap_applies_to_a_single_long_line(tmp_path, monkeypatch):
+    name = _script(tmp_path, monkeypatch, "import sys, time\nsys.stdout.write('x' * 200_000)\n"
+                                          "sys.stdout.flush()\ntime.sleep(60)\n")
+    lines = []
+    ok, out = asyncio.run(tm.run_script_async(name, timeout=2, max_bytes=100_000,
+                                              on_line=lambda stream, line: lines.append((stream, line))))
+    assert not ok and "timed out" in out
+    assert lines[-1] == ("stderr", "[output truncated after 100000 bytes]")
+    assert sum(len(line) for stream, line in lines if stream == "stdout") <= 100_000
+
+
+def test_saturated_callable_threads_fall_back_to_process_pool(tmp_path, monkeypatch):
+    import threading
+
+    import worker_pool
+
+    release = threading.Event()
+    path = tmp_path / "hang.py"
+    path.write_text("def main():\n    release.wait(30)\n    return 'late'\n")
+    monkeypatch.setattr(tm, "_resolve_script", lambda name, index_file=tm.INDEX_FILE: (str(path), ""))
+    tm.load_script_module(str(path)).release = release
+
+    class _Pool:
+        def call(self, script_path, args, timeout=None):
+            return True, "ran in pool"
+
+    monkeypatch.setattr(worker_pool, "get_pool", lambda: _Pool())
+    try:
+        for _ in range(tm.CALLABLE_WORKERS):
+            ok, out = tm.run_callable("hang.py", {}, timeout=0.05, mode="thread")
+            assert not ok and "still running" in out
+        assert tm.run_callable("hang.py", {}, timeout=0.05, mode="thread") == (True, "ran in pool")
+    finally:
+        release.set()
+    deadline = time.monotonic() + 5
+    while tm._callable_busy and time.monotonic() < deadline:  # timed-out calls hand their threads back
+        time.sleep(0.01)
+    assert tm.run_callable("hang.py", {}, timeout=5, mode="thread") == (True, "late")
+
+
+def test_module_doc_after_imports(tmp_path):
+    path = tmp_path / "late_doc.py"
+    path.write_text('import os\nfrom sys import argv\n\n"""\n    Tile windows\n    into a grid.\n"""\n')
+    assert tm.describe_script(str(path))["doc"] == "Tile windows\ninto a grid."
+
+
+def test_module_doc_prefers_real_docstring_then_comments(tmp_path):
+    path = tmp_path / "doc.py"
+    path.write_text('"""Real docstring."""\nimport os\n"""not this"""\n')
+    assert tm.describe_script(str(path))["doc"] == "Real docstring."
+    path.write_text("# Header comment\nimport os\nx = 1\n'''too late'''\n")
+    assert tm.describe_script(str(path))["doc"] == "Header comment"
+
+
+def _timer_script(tmp_path, monkeypatch):
+    scripts = tmp_path / "scripts"
+    scripts.mkdir()
+    (scripts / "aura_test_timer.py").write_text(
+        "def main(minutes: int, message: str = 'ping', loud: bool = False, ratio: float = 1.0):\n    pass\n")
+    index = tmp_path / "script_index.txt"
+    index.write_text("aura_test_timer.py\n")
+    monkeypatch.setattr(tm, "SCRIPTS_DIR", str(scripts))
+    return str(index)
+
+
+def test_validate_args_unknown_and_missing(tmp_path, monkeypatch):
+    index = _timer_script(tmp_path, monkeypatch)
+    assert tm.validate_args("other.py", {}, index) == (None, "Script not allowed: other.py")
+    checked, reason = tm.validate_args("aura_test_timer.py", {"minutes": 1, "color": "red"}, index)
+    assert checked is None and reason == "Unknown argument(s) for aura_test_timer.py: color"
+    checked, reason = tm.validate_args("aura_test_timer.py", {"message": "hi"}, index)
+    assert checked is None and reason == "Missing argument(s) for aura_test_timer.py: minutes"
+
+
+def test_validate_args_coerces_annotated_strings(tmp_path, monkeypatch):
+    index = _timer_script(tmp_path, monkeypatch)
+    checked, _ = tm.validate_args("aura_test_timer.py",
+                                  {"minutes": "5", "loud": "yes", "ratio": "0.5", "message": "7"}, index)
+    assert checked == {"minutes": 5, "loud": True, "ratio": 0.5, "message": "7"}
+    checked, reason = tm.validate_args("aura_test_timer.py", {"minutes": "soon"}, index)
+    assert checked is None and "not a valid int" in reason
+
+
+def test_sync_stream_keeps_long_lines_out_of_memory(tmp_path, monkeypatch):
+    name = _script(tmp_path, monkeypatch, "import sys\nsys.stdout.write('x' * 200_000)\n")
+    lines = []
+    ok, message = tm.run_script_streaming(name, lambda stream, line: lines.append(line), max_bytes=50_000)
+    assert ok and len(message) <= 50_000
+    assert max(len(line) for line in lines) <= tm.STREAM_READ_CHUNK
+    assert lines[-1] == "[output truncated after 50000 bytes]"
@@ -0,0 +1,32 @@
+import numpy as np
+
+import vad
+
+RATE = 16000
+
+
+def _tone(seconds: float, amplitude: float) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _noise(seconds: float, amplitude: float = 0.002) -> np.ndarray:
+    return np.random.default_rng(0).normal(0, amplitude, int(seconds * RATE)).astype(np.float32)
+
+
+def _captured_seconds(pcm: np.ndarray) -> float:
+    return vad.endpoint_frames(vad.split_frames(pcm, RATE), RATE).size / RATE
+
+
+def test_speech_from_first_frame_is_captured():
+    pcm = np.concatenate([_tone(1.5, 0.3), _noise(1.5)])
+    assert 1.4 <= _captured_seconds(pcm) <= 2.0
+
+
+def test_speech_after_silence_is_captured():
+    pcm = np.concatenate([_noise(0.5), _tone(1.5, 0.3), _noise(1.5)])
+    assert 1.4 <= _captured_seconds(pcm) <= 2.2
+
+
+def test_silence_only_captures_nothing():
+    assert _captured_seconds(_noise(10)) == 0.0
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+import task_matcher as tm
+from vector_index import IVFIndex, exact_search, top_k
+
+
+def _clustered(n, dim=64, seed=1):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(50, dim))
+    rows = centers[rng.integers(0, 50, n)] + 0.8 * rng.normal(size=(n, dim))
+    return (rows / np.linalg.norm(rows, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_top_k_is_ordered_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7, 0.3], dtype=np.float32)
+    idx, top = top_k(scores, 3)
+    assert idx.tolist() == [1, 3, 2] and top.tolist() == pytest.approx([0.9, 0.7, 0.5])
+    assert top_k(scores, 10)[0].tolist() == [1, 3, 2, 4, 0]
+    assert top_k(scores, 0)[0].size == 0
+
+
+def test_ivf_with_every_list_probed_matches_exact_search():
+    matrix = _clustered(3000)
+    index = IVFIndex(matrix)
+    for query in matrix[:20]:
+        approx, _ = index.search(query, 5, nprobe=index.nlist)
+        assert approx.tolist() == exact_search(matrix, query, 5)[0].tolist()
+
+
+def test_ivf_default_recall_against_exact_search():
+    matrix = _clustered(10_000)
+    rng = np.random.default_rng(2)
+    queries = matrix[rng.integers(0, len(matrix), 100)] + 0.3 * rng.normal(size=(100, matrix.shape[1]))
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+    index = IVFIndex(matrix)
+    recall = np.mean([len(set(index.search(q, 5)[0]) & set(exact_search(matrix, q, 5)[0])) / 5 for q in queries])
+    assert recall >= 0.85
+
+
+def test_empty_store_returns_no_candidates(monkeypatch):
+    matcher = tm.ScriptMatcher("unused.json")
+
+    def _empty_refresh():
+        matcher.matrix = np.zeros((0, 0), dtype=np.float32)
+
+    monkeypatch.setattr(matcher, "refresh", _empty_refresh)
+    monkeypatch.setattr(matcher, "encode_batch", lambda texts: pytest.fail("encoded against an empty store"))
+    assert matcher.search_batch(["take a screenshot", "tile"], k=3) == [[], []]
+    with pytest.raises(ValueError, match="Embedding store is empty"):
+        matcher.match("take a screenshot")
@@ -0,0 +1,92 @@
+import pandas as pd
+
+import whatsapp_chat_analyser as wca
+
+
+def _lines(first: int, count: int) -> str:
+    return "".join(f"01/10/25, 10:{i % 60:02d} am - Sender {i % 7}: message number {i:07d}\n"
+                   for i in range(first, first + count))
+
+
+def test_cache_detects_mid_file_edit_with_append(tmp_path):
+    chat = tmp_path / "chat.txt"
+    chat.write_text(_lines(0, 60_000), encoding="utf-8")  # ~3.3 MB, well past any sampled ends
+    cache = str(tmp_path / "cache")
+    assert len(wca.load_chat(str(chat), cache)) == 60_000
+
+    data = chat.read_bytes()
+    target = b"message number 0030000"
+    at = data.index(target)
+    edited = data[:at] + b"EDITED! number 0030000" + data[at + len(target):]
+    chat.write_bytes(edited + _lines(60_000, 10).encode("utf-8"))
+
+    df = wca.load_chat(str(chat), cache)
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), wca.parse_chat(str(chat)).reset_index(drop=True))
+    assert "EDITED! number 0030000" in set(df["message"])
+
+
+def test_cache_parses_only_appended_messages(tmp_path):
+    chat = tmp_path / "chat.txt"
+    chat.write_text(_lines(0, 1000), encoding="utf-8")
+    cache = str(tmp_path / "cache")
+    wca.load_chat(str(chat), cache)
+    with open(chat, "a", encoding="utf-8") as f:
+        f.write(_lines(1000, 5))
+    df = wca.load_chat(str(chat), cache)
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), wca.parse_chat(str(chat)).reset_index(drop=True))
+    assert wca.load_chat(str(chat), cache)["message"].iloc[-1] == "message number 0001004"
+
+
+def test_directory_report_matches_normalized_repeats_across_groups(tmp_path):
+    for name, sender, text in (("a", "Alice", "join my channel now"), ("b", "Bob", "Join my  channel NOW!"),
+                               ("c", "Carol", "join my channel now")):
+        (tmp_path / f"{name}.txt").write_text(
+            f"01/10/25, 10:00 am - {sender}: {text}\n"
+            f"01/10/25, 10:01 am - {sender}: hello from {name}\n", encoding="utf-8")
+    report = wca.analyse_directory(str(tmp_path), "2025-10-01", "2025-10-02", threshold=2,
+                                   workers=1, use_cache=False)
+    summary = wca.chat_summary(str(tmp_path / "a.txt"), "2025-10-01", "2025-10-02", use_cache=False)
+    assert summary["previews"] == {}
+    assert report["repeated"] == [("join my channel now", 3, 3)]
+
+
+def _frame(rows):
+    return pd.DataFrame({"datetime": pd.Timestamp("2025-10-01"), "sender": [s for s, _ in rows],
+                         "message": [m for _, m in rows]})
+
+
+SPAM = _frame([
+    ("Alice", "Join my channel for FREE daily crypto signals!!"),
+    ("Alice", "join my channel for free daily crypto signals"),
+    ("Alice", "Join my channel for free daily crypto signal <This message was edited>"),
+    ("Bob", "Join my channel   for free daily crypto signals."),
+] + [("Carol", text) for text in ("who is bringing the projector", "lunch is at noon near the lab",
+                                   "slides are due friday evening", "can someone share the wifi password",
+                                   "the judges arrive around ten", "remember to push your code tonight",
+                                   "room 204 is free for practice", "thanks everyone, great work today")]
+  + [("Dave", "<Media omitted>")] * 6 + [("Dave", "This message was deleted")] * 3)
+
+
+def test_near_duplicate_variants_share_a_cluster_and_placeholders_are_excluded():
+    clusters = wca.near_duplicate_clusters(SPAM["message"])
+    assert len(set(clusters[:4])) == 1 and clusters[0] >= 0
+    assert len(set(clusters[4:12])) == 8
+    assert (clusters[12:] == -1).all()
+    repeated = wca.find_repeated_messages(SPAM, threshold=2)
+    assert repeated.tolist() == [4]
+    assert "crypto" in repeated.index[0]
+
+
+def test_top_spammer_ranks_by_repeated_content_not_volume():
+    spam = wca.spam_by_sender(SPAM, threshold=2)
+    assert spam.to_dict() == {"Alice": 3, "Bob": 1}
+    assert wca.top_spammer(SPAM, threshold=2) == ("Alice", 3)
+    assert wca.top_spammer(SPAM.iloc[4:], threshold=2) == (None, 0)
+
+
+def test_cross_group_section_skips_single_group_repeats(tmp_path):
+    (tmp_path / "a.txt").write_text("".join(f"01/10/25, 10:0{i} am - Alice: ok\n" for i in range(5)), encoding="utf-8")
+    (tmp_path / "b.txt").write_text("01/10/25, 10:00 am - Bob: see you\n", encoding="utf-8")
+    report = wca.analyse_directory(str(tmp_path), "2025-10-01", "2025-10-02", workers=1, use_cache=False)
+    assert report["repeated"] == []
+    assert [g["repeated"] for g in report["groups"]] == [[("ok", 5)], []]
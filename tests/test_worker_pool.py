@@ -0,0 +1,41 @@
+import threading
+import time
+
+import pytest
+
+import worker_pool
+
+
+@pytest.fixture
+def pool():
+    p = worker_pool.WorkerPool(size=1, preload=[])
+    yield p
+    p.shutdown()
+
+
+@pytest.fixture
+def hang_script(tmp_path):
+    path = tmp_path / "hang.py"
+    path.write_text("import time\ntime.sleep(60)\n")
+    return str(path)
+
+
+def test_default_timeout_applies_when_caller_passes_none(pool, hang_script, monkeypatch):
+    monkeypatch.setattr(worker_pool, "POOL_TIMEOUT", 3.0)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.run(hang_script, timeout=None)
+    assert time.monotonic() - start < 10
+
+
+def test_waiting_for_a_busy_pool_is_bounded(pool, hang_script, tmp_path):
+    quick = tmp_path / "quick.py"
+    quick.write_text("print('ok')\n")
+    assert pool.run(str(quick), timeout=30) == (0, "ok\n", "")
+
+    busy = threading.Thread(target=lambda: pytest.raises(TimeoutError, pool.run, hang_script, timeout=3))
+    busy.start()
+    time.sleep(0.5)
+    with pytest.raises(TimeoutError, match="No free worker"):
+        pool.run(str(quick), timeout=0.5)
+    busy.join()
@@ -0,0 +1,111 @@
+"""
+Energy-based voice-activity endpointing for streaming capture.
+
+The Endpointer consumes fixed-size float32 PCM frames and decides when an utterance
+has started and ended. It has no audio-device dependency, so recorded or synthetic
+frames can be fed through endpoint_frames() exactly as the live input stream does.
+"""
+import os
+from collections import deque
+from typing import Iterable, List
+
+import numpy as np
+
+# Configuration (override with env vars if needed)
+FRAME_MS = int(os.getenv("AURA_VAD_FRAME_MS", "30"))
+SILENCE_MS = int(os.getenv("AURA_VAD_SILENCE_MS", "700"))  # hangover after speech before endpointing
+MAX_SECONDS = float(os.getenv("AURA_VAD_MAX_SECONDS", "15"))
+START_TIMEOUT = float(os.getenv("AURA_VAD_START_TIMEOUT", "8"))  # give up if nobody speaks
+ENERGY_THRESH = float(os.getenv("AURA_VAD_THRESH", "0.01"))  # absolute RMS floor for speech
+NOISE_RATIO = float(os.getenv("AURA_VAD_NOISE_RATIO", "3.0"))  # speech must exceed noise floor by this
+PRE_ROLL_MS = 200
+MIN_SPEECH_FRAMES = 2
+
+
+class Endpointer:
+    """Frame-level speech start/end detector with pre-roll, silence hangover and length caps."""
+
+    def __init__(self, samplerate: int, frame_ms: int = FRAME_MS, silence_ms: int = SILENCE_MS,
+                 max_seconds: float = MAX_SECONDS, start_timeout: float = START_TIMEOUT,
+                 threshold: float = ENERGY_THRESH, noise_ratio: float = NOISE_RATIO):
+        self.samplerate = samplerate
+        self.frame_len = max(1, samplerate * frame_ms // 1000)
+        self.threshold = threshold
+        self.noise_ratio = noise_ratio
+        self.hangover_frames = max(1, silence_ms // frame_ms)
+        self.max_frames = max(1, int(max_seconds * 1000 // frame_ms))
+        self.start_timeout_frames = max(1, int(start_timeout * 1000 // frame_ms))
+        self._pre_roll: deque = deque(maxlen=max(1, PRE_ROLL_MS // frame_ms))
+        self._frames: List[np.ndarray] = []
+        # start from the absolute threshold rather than the first frame, which may already be speech
+        self._noise_floor = threshold / noise_ratio
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._seen = 0
+        self.started = False
+        self.done = False
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(np.square(frame, dtype=np.float32)))) if frame.size else 0.0
+        voiced = rms > max(self.threshold, self._noise_floor * self.noise_ratio)
+        if not voiced:
+            # track background level only while nobody is talking
+            self._noise_floor = 0.95 * self._noise_floor + 0.05 * rms
+        return voiced
+
+    def push(self, frame: np.ndarray) -> bool:
+        """Feed one mono float32 frame. Returns True once the utterance is complete."""
+        if self.done:
+            return True
+        frame = np.asarray(frame, dtype=np.float32).reshape(-1)
+        self._seen += 1
+        voiced = self.is_speech(frame)
+
+        if not self.started:
+            self._pre_roll.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= MIN_SPEECH_FRAMES:
+                self.started = True
+                self._frames.extend(self._pre_roll)
+                self._pre_roll.clear()
+            elif self._seen >= self.start_timeout_frames:
+                self.done = True
+            return self.done
+
+        self._frames.append(frame)
+        self._silent_run = 0 if voiced else self._silent_run + 1
+        if self._silent_run >= self.hangover_frames or len(self._frames) >= self.max_frames:
+            self.done = True
+        return self.done
+
+    @property
+    def speech_seconds(self) -> float:
+        """Time from speech onset (pre-roll included) to the endpoint; 0 if nobody spoke."""
+        return len(self._frames) * self.frame_len / self.samplerate
+
+    def audio(self) -> np.ndarray:
+        """Captured utterance as one float32 array (empty if no speech was detected)."""
+        if not self._frames:
+            return np.zeros(0, dtype=np.float32)
+        # drop the trailing silence hangover, keep a short tail so word endings aren't clipped
+        keep = len(self._frames) - max(0, self._silent_run - self.hangover_frames // 3)
+        return np.concatenate(self._frames[:keep])
+
+
+def endpoint_frames(frames: Iterable[np.ndarray], samplerate: int, **kwargs) -> np.ndarray:
+    """Run frames through an Endpointer until it fires and return the utterance audio."""
+    ep = Endpointer(samplerate, **kwargs)
+    for frame in frames:
+        if ep.push(frame):
+            break
+    return ep.audio()
+
+
+def split_frames(pcm: np.ndarray, samplerate: int, frame_ms: int = FRAME_MS) -> Iterable[np.ndarray]:
+    """Yield fixed-size frames from a recorded mono buffer (int16 is scaled to [-1, 1])."""
+    pcm = np.asarray(pcm).reshape(-1)
+    if pcm.dtype == np.int16:
+        pcm = pcm.astype(np.float32) / 32768.0
+    n = max(1, samplerate * frame_ms // 1000)
+    for start in range(0, len(pcm), n):
+        yield pcm[start:start + n]
@@ -0,0 +1,80 @@
+"""
+Vector search helpers for the script matcher.
+
+All vectors are expected to be L2-normalized, so the inner product is the cosine score.
+top_k() is an exact partial-selection search; IVFIndex is a pure-NumPy inverted-file
+(clustered) approximate index for catalogs too large to scan on every query.
+"""
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# IVF defaults: clusters ~ sqrt(n), probe enough of them to keep recall high
+IVF_ITERS = 10
+IVF_NPROBE = 16
+IVF_SEED = 0
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (indices, scores) of the k highest scores, best first, via argpartition."""
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+    if k < n:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(n)
+    idx = idx[np.argsort(-scores[idx], kind="stable")]
+    return idx, scores[idx]
+
+
+def exact_search(matrix: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Brute-force top-k over every row of matrix."""
+    return top_k(matrix @ query, k)
+
+
+class IVFIndex:
+    """Inverted-file index: spherical k-means clusters, search probes the nprobe closest lists."""
+
+    def __init__(self, matrix: np.ndarray, nlist: Optional[int] = None, nprobe: int = IVF_NPROBE,
+                 iters: int = IVF_ITERS, seed: int = IVF_SEED):
+        n = matrix.shape[0]
+        self.nlist = max(1, min(n, nlist or int(math.sqrt(n))))
+        self.nprobe = max(1, min(nprobe, self.nlist))
+        data = np.asarray(matrix, dtype=np.float32)
+        self.centroids = self._kmeans(data, self.nlist, iters, seed)
+        assign = np.argmax(data @ self.centroids.T, axis=1)
+
+        # store rows grouped by cluster so each probed list is a contiguous slice
+        self.order = np.argsort(assign, kind="stable")
+        self.vectors = np.ascontiguousarray(data[self.order])
+        counts = np.bincount(assign, minlength=self.nlist)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    @staticmethod
+    def _kmeans(data: np.ndarray, nlist: int, iters: int, seed: int) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(data.shape[0], size=nlist, replace=False)].copy()
+        for _ in range(iters):
+            assign = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, data)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # re-seed empty clusters from random points instead of leaving them dead
+            if empty.any():
+                sums[empty] = data[rng.choice(data.shape[0], size=int(empty.sum()), replace=False)]
+                norms[empty] = 1.0
+            centroids = sums / norms
+        return centroids
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k: (original row indices, scores), best first."""
+        probe = min(nprobe or self.nprobe, self.nlist)
+        lists, _ = top_k(self.centroids @ query, probe)
+        spans: List[np.ndarray] = [np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists]
+        cand = np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+        local, scores = top_k(self.vectors[cand] @ query, k)
+        return self.order[cand[local]], scores
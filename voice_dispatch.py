@@ -2,20 +2,26 @@ import os
 import sys
 import time
 import logging
+import queue
 import tempfile
-from typing import Optional
-from intent_parser import parse_command
+import threading
+from typing import TYPE_CHECKING, Optional
 
-import torch
-import sounddevice as sd
 import numpy as np
-import scipy.io.wavfile
-from faster_whisper import WhisperModel
 
-import dispatcher as disp
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+# torch, sounddevice, scipy and faster_whisper are imported where they are used so that
+# importing this module (and starting AURA in text mode) stays cheap.
+
+import router
+import spans
+import vad
 
 # Configuration (override with env vars if needed)
 SAMPLE_RATE = int(os.getenv("AURA_SAMPLE_RATE", "16000"))
+WHISPER_RATE = 16000  # faster-whisper decodes ndarray input as 16 kHz mono
 DURATION = int(os.getenv("AURA_DURATION", "5"))
 AUDIO_PATH = os.getenv("AURA_AUDIO_PATH", "input.wav")
 MODEL_SIZE = os.getenv("AURA_MODEL_SIZE", "base.en")  # prefer English-only for safety
@@ -23,6 +29,9 @@ FORCE_DEVICE = os.getenv("AURA_DEVICE", "")  # set to "cpu" or "cuda" to overrid
 COMPUTE_TYPE = os.getenv("AURA_COMPUTE_TYPE", "int8")
 BEAM_SIZE = int(os.getenv("AURA_BEAM_SIZE", "5"))
 LOG_PATH = os.getenv("AURA_LOG_PATH", "logs/voice_dispatch.log")
+PIPELINE_WORKERS = int(os.getenv("AURA_PIPELINE_WORKERS", "1"))  # transcription/parse threads in --pipeline mode
+PIPELINE_QUEUE = int(os.getenv("AURA_PIPELINE_QUEUE", "4"))  # max utterances waiting to be processed
+CAPTURE_MODE = os.getenv("AURA_CAPTURE", "vad")  # "vad" (stop when speaker stops) or "fixed" (AURA_DURATION)
 
 # Logging
 os.makedirs(os.path.dirname(LOG_PATH) or ".", exist_ok=True)
@@ -32,41 +41,99 @@ handler = logging.FileHandler(LOG_PATH)
 handler.setFormatter(logging.Formatter("%(asctime)s\t%(levelname)s\t%(message)s"))
 logger.addHandler(handler)
 
-_model: Optional[WhisperModel] = None
+_model: Optional["WhisperModel"] = None
 _model_device: Optional[str] = None
+_model_lock = threading.Lock()  # warm-up and first command may race to load the model
 
 def _detect_device() -> str:
     if FORCE_DEVICE:
         return FORCE_DEVICE
     try:
-        import torch  # re-import for environments where torch isn't present at module import
+        import torch  # only needed for CUDA detection
         return "cuda" if torch.cuda.is_available() else "cpu"
     except Exception:
         return "cpu"
 
 
-def get_model() -> WhisperModel:
+def get_model() -> "WhisperModel":
     """Lazy-load and return the WhisperModel singleton."""
+    with _model_lock:
+        if _model is None:
+            _load_model()
+    return _model
+
+
+def _load_model() -> None:
     global _model, _model_device
-    if _model is None:
-        device = _detect_device()
-        # Attempt GPU then fallback to CPU if GPU initialization fails
-        if device == "cuda":
-            try:
-                _model = WhisperModel(MODEL_SIZE, device="cuda", compute_type=COMPUTE_TYPE)
-                _model_device = "cuda"
-            except Exception as e:
-                logger.warning("GPU model init failed, falling back to CPU: %s", e)
-                _model = WhisperModel(MODEL_SIZE, device="cpu", compute_type=COMPUTE_TYPE)
-                _model_device = "cpu"
-        else:
+    from faster_whisper import WhisperModel
+
+    device = _detect_device()
+    # Attempt GPU then fallback to CPU if GPU initialization fails
+    if device == "cuda":
+        try:
+            _model = WhisperModel(MODEL_SIZE, device="cuda", compute_type=COMPUTE_TYPE)
+            _model_device = "cuda"
+        except Exception as e:
+            logger.warning("GPU model init failed, falling back to CPU: %s", e)
             _model = WhisperModel(MODEL_SIZE, device="cpu", compute_type=COMPUTE_TYPE)
             _model_device = "cpu"
-        logger.info("Loaded WhisperModel size=%s device=%s compute_type=%s", MODEL_SIZE, _model_device, COMPUTE_TYPE)
-    return _model
+    else:
+        _model = WhisperModel(MODEL_SIZE, device="cpu", compute_type=COMPUTE_TYPE)
+        _model_device = "cpu"
+    logger.info("Loaded WhisperModel size=%s device=%s compute_type=%s", MODEL_SIZE, _model_device, COMPUTE_TYPE)
+
+def warm_up() -> None:
+    """Load Whisper and run a tiny inference so the first utterance doesn't pay for it."""
+    model = get_model()
+    segments, _ = model.transcribe(np.zeros(WHISPER_RATE // 2, dtype=np.float32), beam_size=1)
+    list(segments)
+
+def stream_until_silence(samplerate: int = SAMPLE_RATE, max_seconds: float = vad.MAX_SECONDS) -> np.ndarray:
+    """Capture from the default input device until the endpointer detects end of speech."""
+    return _stream_utterance(samplerate, max_seconds).audio()
+
+
+def _stream_utterance(samplerate: int = SAMPLE_RATE, max_seconds: float = vad.MAX_SECONDS) -> vad.Endpointer:
+    ep = vad.Endpointer(samplerate, max_seconds=max_seconds)
+    frames: "queue.Queue[np.ndarray]" = queue.Queue()
+
+    def _callback(indata, _frames, _time, status):
+        if status:
+            logger.warning("Input stream status: %s", status)
+        frames.put(indata[:, 0].copy())
+
+    import sounddevice as sd
+
+    with sd.InputStream(samplerate=samplerate, channels=1, dtype="float32",
+                        blocksize=ep.frame_len, callback=_callback):
+        while not ep.push(frames.get()):
+            pass
+    return ep
+
+
+def record_audio(duration: int = DURATION, samplerate: int = SAMPLE_RATE, capture: str = CAPTURE_MODE) -> np.ndarray:
+    """
+    Record mono audio and return it as a float32 array in [-1, 1].
+    capture="vad" stops as soon as the speaker goes quiet (duration is unused);
+    capture="fixed" records exactly `duration` seconds.
+    """
+    print("🎙 Speak now...")
+    if capture == "vad":
+        audio = stream_until_silence(samplerate=samplerate)
+    else:
+        import sounddevice as sd
+
+        audio = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=1, dtype="float32")
+        sd.wait()
+        audio = audio[:, 0]
+    logger.info("Recorded audio in memory (capture=%s, duration=%.2fs, rate=%d)",
+                capture, len(audio) / samplerate, samplerate)
+    return audio
+
 
-def record_voice(filename: str = AUDIO_PATH, duration: int = DURATION, samplerate: int = SAMPLE_RATE) -> str:
-    """Record a fixed-duration mono WAV and return the file path."""
+def record_voice(filename: str = AUDIO_PATH, duration: int = DURATION, samplerate: int = SAMPLE_RATE,
+                 capture: str = CAPTURE_MODE) -> str:
+    """Record a mono WAV and return the file path (debugging path; normal dispatch stays in memory)."""
     # Use a temp file if the configured AUDIO_PATH is not desired to persist
     use_temp = filename == "input.wav" and os.getenv("AURA_USE_TEMPFILE", "1") == "1"
     out_path = filename
@@ -74,51 +141,78 @@ def record_voice(filename: str = AUDIO_PATH, duration: int = DURATION, samplerat
         fd, out_path = tempfile.mkstemp(suffix=".wav")
         os.close(fd)
 
-    print("🎙 Speak now...")
-    audio = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=1, dtype='int16')
-    sd.wait()
-    scipy.io.wavfile.write(out_path, samplerate, audio)
-    logger.info("Recorded audio to %s (duration=%ds, rate=%d)", out_path, duration, samplerate)
+    audio = record_audio(duration=duration, samplerate=samplerate, capture=capture)
+    import scipy.io.wavfile
+
+    scipy.io.wavfile.write(out_path, samplerate, (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16))
+    logger.info("Recorded audio to %s (capture=%s, duration=%.2fs, rate=%d)",
+                out_path, capture, len(audio) / samplerate, samplerate)
     return out_path
 
+def _to_whisper_rate(audio: np.ndarray, samplerate: int) -> np.ndarray:
+    """Whisper expects 16 kHz float32 mono; resample linearly if the capture rate differs."""
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    if samplerate == WHISPER_RATE or audio.size == 0:
+        return audio
+    n_out = int(round(audio.size * WHISPER_RATE / samplerate))
+    positions = np.linspace(0, audio.size - 1, n_out)
+    return np.interp(positions, np.arange(audio.size), audio).astype(np.float32)
+
+def transcribe_audio(audio: np.ndarray, samplerate: int = SAMPLE_RATE) -> str:
+    """Transcribe an in-memory float32 buffer without touching disk."""
+    if audio.size == 0:
+        return ""
+    model = get_model()
+    with spans.span("transcribe", audio_s=round(audio.size / samplerate, 2)):
+        segments, _ = model.transcribe(_to_whisper_rate(audio, samplerate), beam_size=BEAM_SIZE)
+        text = " ".join([seg.text for seg in segments]).strip()
+    logger.info("Transcription result (%.2fs in-memory audio): %s", audio.size / samplerate, text.replace("\n", " "))
+    return text
+
 def _transcribe_file(path: str) -> str:
     model = get_model()
-    segments, _ = model.transcribe(path, beam_size=BEAM_SIZE)
-    text = " ".join([seg.text for seg in segments]).strip()
+    with spans.span("transcribe", source="file"):
+        segments, _ = model.transcribe(path, beam_size=BEAM_SIZE)
+        text = " ".join([seg.text for seg in segments]).strip()
     logger.info("Transcription result for %s: %s", path, text.replace("\n", " "))
     return text
 
-def transcribe_and_dispatch_once(duration: int = DURATION, samplerate: int = SAMPLE_RATE, cleanup: bool = True):
-    """Record once, transcribe, dispatch, and optionally delete the audio file."""
-    audio_path = None
+def _dispatch_text(user_input: str, decision: Optional[router.Route] = None):
+    """Dispatch a transcribed command, routing it first unless the caller already did."""
+    logger.info("Dispatching user_input: %s", user_input)
+    if decision is None:
+        decision = router.route(user_input)
+    router.dispatch_route(user_input, decision)
+
+def transcribe_and_dispatch_once(duration: int = DURATION, samplerate: int = SAMPLE_RATE, cleanup: bool = True,
+                                 capture: str = CAPTURE_MODE):
+    """
+    Record once, transcribe and dispatch. Audio stays in memory; with cleanup=False the
+    recording is written to a WAV, transcribed from that file and kept for debugging.
+    """
     try:
-        audio_path = record_voice(duration=duration, samplerate=samplerate)
-        user_input = _transcribe_file(audio_path)
-        if not user_input:
-            print("No speech detected.")
-            logger.info("No transcription text detected; skipping dispatch.")
-            return
-        print(f"🗣 Transcribed: {user_input}")
-        logger.info("Dispatching user_input: %s", user_input)
-        result = parse_command(user_input)
-        if result:
-            script_name, args = result
-            disp.dispatch(script_name=script_name, args=args)
-        else:
-            disp.dispatch(user_input)
+        with spans.request():
+            if cleanup:
+                with spans.span("capture", mode=capture):
+                    audio = record_audio(duration=duration, samplerate=samplerate, capture=capture)
+                user_input = transcribe_audio(audio, samplerate)
+            else:
+                with spans.span("capture", mode=capture):
+                    audio_path = record_voice(duration=duration, samplerate=samplerate, capture=capture)
+                print(f"Kept recording at {audio_path}")
+                user_input = _transcribe_file(audio_path)
+            if not user_input:
+                print("No speech detected.")
+                logger.info("No transcription text detected; skipping dispatch.")
+                return
+            print(f"🗣 Transcribed: {user_input}")
+            _dispatch_text(user_input)
     except KeyboardInterrupt:
         logger.info("Interrupted by user during recording/transcription.")
         print("\nInterrupted.")
     except Exception as e:
         logger.exception("Error during transcribe_and_dispatch: %s", e)
         print(f"Error: {e}")
-    finally:
-        if cleanup and audio_path and os.path.exists(audio_path):
-            try:
-                os.remove(audio_path)
-                logger.info("Removed audio file %s", audio_path)
-            except Exception as e:
-                logger.warning("Failed to remove audio file %s: %s", audio_path, e)
 
 def live_loop():
     """Continuous voice loop: record -> transcribe -> dispatch -> confirm -> repeat/quit."""
@@ -134,16 +228,111 @@ def live_loop():
             print("\nExiting voice loop.")
             break
 
+def pipelined_loop(samplerate: int = SAMPLE_RATE, workers: int = PIPELINE_WORKERS,
+                   queue_size: int = PIPELINE_QUEUE):
+    """
+    Hands-free loop: a capture thread records utterances back to back onto a bounded queue
+    while worker threads transcribe and parse them. Dispatch (which prompts for confirmation)
+    is serialized and happens in capture order, so prompts never interleave.
+    """
+    utterances: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    turn = threading.Condition()
+    next_seq = [0]
+
+    def _capture():
+        seq = 0
+        while not stop.is_set():
+            try:
+                ep = _stream_utterance(samplerate)
+            except Exception as e:
+                logger.exception("Capture failed: %s", e)
+                stop.set()
+                break
+            audio = ep.audio()
+            if audio.size == 0:
+                continue
+            # the capture span covers speech onset to endpoint, not the idle wait before it
+            timing = (spans.new_request_id(), time.time() - ep.speech_seconds, ep.speech_seconds * 1000)
+            logger.info("Queued utterance #%d (%.2fs, backlog=%d)", seq, audio.size / samplerate, utterances.qsize())
+            while not stop.is_set():
+                try:
+                    utterances.put((seq, audio, timing), timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            seq += 1
+
+    def _worker():
+        while True:
+            item = utterances.get()
+            if item is None:
+                return
+            seq, audio, (request_id, capture_start, capture_ms) = item
+            text, decision = "", None
+            try:
+                with spans.request(request_id):
+                    text = transcribe_audio(audio, samplerate)
+                    if text:  # utterances that transcribe to nothing are left out of the capture stats
+                        spans.record("capture", capture_ms, start=capture_start, mode="vad")
+                        decision = router.route(text)
+            except Exception as e:
+                logger.exception("Processing utterance #%d failed: %s", seq, e)
+            # wait for our turn so dispatches (and their prompts) run one at a time, in order
+            with turn:
+                turn.wait_for(lambda: next_seq[0] == seq or stop.is_set())
+                try:
+                    if text and not stop.is_set():
+                        print(f"\n🗣 Transcribed: {text}")
+                        with spans.request(request_id):
+                            _dispatch_text(text, decision)
+                except Exception as e:
+                    logger.exception("Dispatch of utterance #%d failed: %s", seq, e)
+                    print(f"Error: {e}")
+                finally:
+                    next_seq[0] = seq + 1
+                    turn.notify_all()
+
+    threads = [threading.Thread(target=_worker, name=f"aura-voice-worker-{i}", daemon=True)
+               for i in range(max(1, workers))]
+    for t in threads:
+        t.start()
+    capture = threading.Thread(target=_capture, name="aura-voice-capture", daemon=True)
+    capture.start()
+
+    print("🎙 Listening continuously. Press Ctrl+C to exit.")
+    try:
+        while capture.is_alive():
+            capture.join(0.5)
+    except KeyboardInterrupt:
+        print("\nExiting voice loop.")
+    finally:
+        stop.set()
+        with turn:
+            turn.notify_all()
+        for _ in threads:
+            try:
+                utterances.put_nowait(None)
+            except queue.Full:
+                break
+
 # Allow CLI invocation: python -m voice_dispatch --live or --once
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="AURA voice dispatch")
     parser.add_argument("--live", action="store_true", help="Enter continuous voice loop")
-    parser.add_argument("--duration", type=int, default=DURATION, help="Record duration seconds")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Hands-free loop: keep recording while earlier commands are processed")
+    parser.add_argument("--duration", type=int, default=DURATION, help="Record duration seconds (fixed capture)")
+    parser.add_argument("--capture", choices=["vad", "fixed"], default=CAPTURE_MODE,
+                        help="vad: stop when the speaker stops; fixed: record --duration seconds")
     parser.add_argument("--samplerate", type=int, default=SAMPLE_RATE, help="Audio sample rate")
     parser.add_argument("--no-cleanup", action="store_true", help="Keep recorded WAV on disk for debugging")
     args = parser.parse_args()
-    if args.live:
+    if args.pipeline:
+        pipelined_loop(samplerate=args.samplerate)
+    elif args.live:
         live_loop()
     else:
-        transcribe_and_dispatch_once(duration=args.duration, samplerate=args.samplerate, cleanup=not args.no_cleanup)
\ No newline at end of file
+        transcribe_and_dispatch_once(duration=args.duration, samplerate=args.samplerate, cleanup=not args.no_cleanup,
+                                     capture=args.capture)
\ No newline at end of file
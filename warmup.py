@@ -0,0 +1,58 @@
+"""
+Background warm-up of the models AURA needs before the first command.
+
+Each task runs on its own daemon thread so slow loads overlap with each other and with
+startup indexing. Callers never have to wait on the Warmup object itself: the model
+getters are lock-protected, so the first command blocks only on the model it uses.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger("main")
+
+
+class Warmup:
+    """Run named warm-up callables concurrently and record how long each took."""
+
+    def __init__(self):
+        self._threads: Dict[str, threading.Thread] = {}
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, BaseException] = {}
+
+    def start(self, name: str, fn: Callable[[], None]) -> None:
+        def _run():
+            t0 = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                self.errors[name] = e
+                logger.warning("Warm-up %s failed after %.2fs: %s", name, time.perf_counter() - t0, e)
+                return
+            self.timings[name] = time.perf_counter() - t0
+            logger.info("Warm-up %s finished in %.2fs", name, self.timings[name])
+
+        thread = threading.Thread(target=_run, name=f"aura-warmup-{name}", daemon=True)
+        self._threads[name] = thread
+        thread.start()
+
+    def wait(self, name: Optional[str] = None, timeout: Optional[float] = None) -> None:
+        """Block until one task (or all of them) has finished."""
+        threads = [self._threads[name]] if name else list(self._threads.values())
+        for thread in threads:
+            thread.join(timeout)
+
+
+def start_warmup(voice: bool) -> Warmup:
+    """Kick off embedding model/store warm-up, plus Whisper when a voice mode will run."""
+    import task_matcher as tm
+
+    warm = Warmup()
+    matcher = tm.get_matcher()
+    warm.start("embed-model", matcher.warm_up)
+    warm.start("embed-store", matcher.refresh)
+    if voice:
+        import voice_dispatch as vd
+        warm.start("whisper", vd.warm_up)
+    return warm
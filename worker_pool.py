@@ -0,0 +1,210 @@
+"""
+Pre-warmed worker processes for script execution.
+
+Each worker is a long-lived, separately spawned interpreter that pre-imports common heavy
+dependencies once and then runs whitelisted scripts (as __main__, via runpy) on request
+over a pipe. This skips interpreter startup and repeated imports for every run while still
+keeping scripts out of the AURA process. Runs that exceed their timeout or crash the worker
+get the worker killed and replaced; workers also retire after max_tasks runs so leaked
+state cannot accumulate.
+"""
+import atexit
+import io
+import logging
+import multiprocessing as mp
+import os
+import queue
+import runpy
+import sys
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("dispatcher")
+
+POOL_SIZE = int(os.getenv("AURA_POOL_SIZE", "2"))
+POOL_MAX_TASKS = int(os.getenv("AURA_POOL_MAX_TASKS", "50"))
+POOL_PRELOAD = [m for m in os.getenv("AURA_POOL_PRELOAD", "pandas,mss,pyttsx3").split(",") if m]
+POOL_TIMEOUT = float(os.getenv("AURA_POOL_TIMEOUT", "300"))  # used when a caller passes timeout=None
+
+
+def _worker_main(conn, preload: Sequence[str]) -> None:
+    """
+    Worker loop: import preload modules, then serve requests until told to stop.
+    ("run", path, argv) executes a script as __main__; ("call", path, kwargs) calls its
+    main()/run() through task_matcher's module cache, so repeat calls skip top-level code.
+    """
+    for name in preload:
+        try:
+            __import__(name)
+        except Exception:
+            pass
+    conn.send(("ready", os.getpid()))
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg is None:
+            return
+        if msg[0] == "call":
+            from task_matcher import call_entry
+            conn.send(call_entry(msg[1], msg[2]))
+            continue
+        _, script_path, argv = msg
+        out, err = io.StringIO(), io.StringIO()
+        code = 0
+        saved_argv, saved_cwd = sys.argv, os.getcwd()
+        sys.argv = [script_path] + list(argv)
+        try:
+            with redirect_stdout(out), redirect_stderr(err):
+                runpy.run_path(script_path, run_name="__main__")
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if e.code is not None and not isinstance(e.code, int):
+                err.write(str(e.code))
+        except BaseException:
+            code = 1
+            err.write(traceback.format_exc())
+        finally:
+            sys.argv = saved_argv
+            os.chdir(saved_cwd)
+        conn.send((code, out.getvalue(), err.getvalue()))
+
+
+class _Worker:
+    def __init__(self, ctx, preload: Sequence[str]):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child, list(preload)), daemon=True)
+        self.proc.start()
+        child.close()
+        self.tasks = 0
+        self.ready = False
+
+    def wait_ready(self, timeout: Optional[float]) -> bool:
+        if not self.ready and self.conn.poll(timeout):
+            self.ready = self.conn.recv()[0] == "ready"
+        return self.ready
+
+    def kill(self) -> None:
+        try:
+            self.conn.close()
+        finally:
+            if self.proc.is_alive():
+                self.proc.kill()
+            self.proc.join(5)
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.proc.join(2)
+        if self.proc.is_alive():
+            self.proc.kill()
+
+
+class WorkerPool:
+    """Fixed-size pool of pre-warmed worker processes with timeout and crash recycling."""
+
+    def __init__(self, size: int = POOL_SIZE, preload: Sequence[str] = POOL_PRELOAD,
+                 max_tasks: int = POOL_MAX_TASKS):
+        self._ctx = mp.get_context("spawn")  # never fork a process that may hold model threads
+        self.preload = list(preload)
+        self.max_tasks = max_tasks
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._all: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(max(1, size)):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._ctx, self.preload)
+        with self._lock:
+            self._all.append(worker)
+        return worker
+
+    def _retire(self, worker: _Worker, kill: bool) -> None:
+        worker.kill() if kill else worker.stop()
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+        if not self._closed:
+            self._idle.put(self._spawn())
+
+    def run(self, script_path: str, args: Sequence[str] = (), timeout: Optional[float] = None
+            ) -> Tuple[int, str, str]:
+        """Run a script in a worker. Returns (exit_code, stdout, stderr); raises TimeoutError."""
+        reply = self._request(("run", os.path.abspath(script_path), list(args)), timeout)
+        if reply is None:
+            return 1, "", "Worker crashed"
+        return reply
+
+    def call(self, script_path: str, kwargs: dict, timeout: Optional[float] = None) -> Tuple[bool, str]:
+        """Call a script's entry point with kwargs in a worker. Returns (success, output_or_error)."""
+        reply = self._request(("call", os.path.abspath(script_path), dict(kwargs)), timeout)
+        if reply is None:
+            return False, "Callable execution error: worker crashed"
+        return reply
+
+    def _request(self, msg: tuple, timeout: Optional[float]):
+        """
+        Send one request to an idle worker; None means the worker died mid-request.
+        timeout (POOL_TIMEOUT if None) bounds the whole request, including the wait for a free worker.
+        """
+        if self._closed:
+            raise RuntimeError("Worker pool is shut down")
+        timeout = POOL_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free worker within {timeout}s") from None
+        try:
+            if not worker.wait_ready(max(0.0, deadline - time.monotonic())):
+                raise TimeoutError("Worker did not start in time")
+            worker.conn.send(msg)
+            if not worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                raise TimeoutError(f"Script timed out after {timeout}s")
+            reply = worker.conn.recv()
+        except TimeoutError:
+            logger.warning("Killing worker pid=%s (timeout running %s)", worker.proc.pid, msg[1])
+            self._retire(worker, kill=True)
+            raise
+        except (EOFError, OSError):
+            self._retire(worker, kill=True)
+            logger.warning("Worker pid=%s crashed running %s (exit code %s)",
+                           worker.proc.pid, msg[1], worker.proc.exitcode)
+            return None
+
+        worker.tasks += 1
+        if worker.tasks >= self.max_tasks:
+            self._retire(worker, kill=False)
+        else:
+            self._idle.put(worker)
+        return reply
+
+    def shutdown(self) -> None:
+        self._closed = True
+        with self._lock:
+            workers = list(self._all)
+            self._all.clear()
+        for worker in workers:
+            worker.stop()
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> WorkerPool:
+    """Return the process-wide worker pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+            atexit.register(_pool.shutdown)
+        return _pool